@@ -7,6 +7,7 @@ __url__ = "https://github.com/Alberto-X3/Alberto-X3-V2"
 
 from .adis_snek import *
 from .aio import *
+from .cache import *
 from .colors import *
 from .config import *
 from .contributor import *
@@ -14,8 +15,11 @@ from .database import *
 from .enum import *
 from .environment import *
 from .events import *
+from .instrumentation import *
+from .language import *
 from .permissions import *
 from .settings import *
+from .startup import *
 from .stats import *
 from .translations import *
 from .types import *
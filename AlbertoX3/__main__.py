@@ -2,6 +2,7 @@ from __future__ import annotations
 
 
 from AlbertUnruhUtils.utils.logger import get_logger
+from functools import partial
 from itertools import count
 from pathlib import Path
 from traceback import format_exception
@@ -26,10 +27,18 @@ from AlbertoX3 import (
     AllColors,
     TOKEN,
     LOG_LEVEL,
+    TRANSLATIONS_LAZY,
     db,
+    redis_listen,
     load_translations,
     t,
+    BlockedUserModel,
+    PermissionsModel,
+    prefetch_settings,
     apply_block_events_adapter,
+    apply_command_db_context,
+    stats_aggregator,
+    startup,
 )
 
 
@@ -105,12 +114,30 @@ async def on_command_error(ctx: SendableContext, error: Exception, *args, **kwar
 
 
 bot.on_command_error = on_command_error
+apply_command_db_context(bot)
 
 
+startup.register(BlockedUserModel.load)
+startup.register(prefetch_settings)
+startup.register(PermissionsModel.load)
+if not TRANSLATIONS_LAZY:
+    startup.register(t.warmup)
+else:
+    # used outside of commands as well (e.g. ``on_command_error``)
+    startup.register(partial(t.load, Config.LANGUAGE_DEFAULT))
+
 event_loop.run_until_complete(db.create_tables())
+event_loop.run_until_complete(startup.run())
 
 # needs to be the last before starting the bot to make sure
 # that every event-processor was already registered
 apply_block_events_adapter(bot)
 
-event_loop.run_until_complete(bot.astart(TOKEN))
+stats_aggregator.start()
+event_loop.create_task(redis_listen())
+
+try:
+    event_loop.run_until_complete(bot.astart(TOKEN))
+finally:
+    # write the remaining stats before shutting down
+    event_loop.run_until_complete(stats_aggregator.stop())
@@ -1,14 +1,18 @@
 from __future__ import annotations
 
 
-__all__ = ("Client",)
+__all__ = (
+    "Client",
+    "apply_command_db_context",
+)
 
 
 import attr
 import copy
 import inspect
 
-from functools import partial
+from functools import partial, wraps
+from time import perf_counter
 from typing import TYPE_CHECKING
 
 from naff import (
@@ -23,9 +27,13 @@ from naff import (
 )
 
 from .colors import AllColors as Colors
-from .database import db_wrapper
-from .stats import try_increment
+from .config import Config
+from .database import db_context, db_wrapper
+from .instrumentation import current_command
+from .language import resolve_language
+from .stats import stats_aggregator, try_increment
 from .translations import t
+from .utils import current_language
 
 
 if TYPE_CHECKING:
@@ -34,7 +42,7 @@ if TYPE_CHECKING:
         PrefixedContext as nPrefixedContext,
         InteractionContext as nInteractionContext,
     )
-    from typing import Callable
+    from typing import Callable, NoReturn
 
 
 class Client(nClient):
@@ -153,7 +161,60 @@ class Client(nClient):
                 raise
 
 
+def apply_command_db_context(bot: nClient) -> NoReturn:
+    """
+    Runs every command invocation (checks, pre-run, callback, post-run and
+    error-handler) in one ``db_context``.
+
+    Parameters
+    ----------
+    bot: nClient
+        The bot to apply the context to.
+
+    Notes
+    -----
+    Sets ``current_command`` and resolves ``current_language`` as well.
+    """
+    bot._run_slash_command = _command_context(bot._run_slash_command)
+    bot._run_prefixed_command = _command_context(bot._run_prefixed_command)
+
+
+def _command_context(func: Callable) -> Callable:
+    @wraps(func)
+    async def decorator(command: nBaseCommand, ctx: nContext):
+        token = current_command.set(get_command_name(command))
+        try:
+            async with db_context():
+                language = await resolve_language(
+                    guild=ctx.guild_id, user=ctx.author.id
+                )
+                # compiles the language off the event-loop in case it's lazy
+                await t.load(language or Config.LANGUAGE_DEFAULT)
+                language_token = current_language.set(language)
+                try:
+                    return await func(command, ctx)
+                finally:
+                    current_language.reset(language_token)
+        finally:
+            current_command.reset(token)
+
+    return decorator
+
+
+def get_command_name(command: nBaseCommand) -> str:
+    return (
+        getattr(command, "resolved_name", None)
+        or getattr(command, "qualified_name", None)
+        or command.name
+    )
+
+
 async def pre_call_callback(self: nBaseCommand, callback: Callable, context: nContext):
     module = inspect.getmodule(self.extension or self.callback)
     await try_increment(module, context)
-    return await self.call_callback(callback, context)
+    name = get_command_name(self)
+    start = perf_counter()
+    try:
+        return await self.call_callback(callback, context)
+    finally:
+        stats_aggregator.record("command", name, perf_counter() - start)
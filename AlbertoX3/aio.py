@@ -5,6 +5,7 @@ __all__ = (
     "event_loop",
     "Thread",
     "LockDeco",
+    "SingleFlight",
     "GatherAnyError",
     "gather_any",
     "run_in_thread",
@@ -16,19 +17,32 @@ __all__ = (
 from threading import Thread as t_Thread
 from asyncio import (
     AbstractEventLoop,
+    CancelledError,
     Event,
+    Future,
     Lock,
     Semaphore,
     create_task,
     gather,
     get_running_loop,
     get_event_loop,
+    shield,
 )
 from functools import partial, update_wrapper, wraps
 from typing import TYPE_CHECKING, TypeVar
 
 if TYPE_CHECKING:
-    from typing import Awaitable, Callable, Coroutine, Optional, NoReturn, Tuple, List
+    from typing import (
+        Awaitable,
+        Callable,
+        Coroutine,
+        Optional,
+        NoReturn,
+        Tuple,
+        List,
+        Dict,
+        Hashable,
+    )
 
 
 T = TypeVar("T")
@@ -77,6 +91,49 @@ class LockDeco:
             return await self.func(*args, **kwargs)
 
 
+class SingleFlight:
+    """
+    Deduplicates concurrent calls with the same key.
+
+    Notes
+    -----
+    Only the first caller runs the call (within its own task),
+    every other caller waits for and receives the same result.
+    If the first caller gets cancelled, one of the waiting callers runs the call.
+    """
+
+    _calls: Dict[Hashable, Future]
+
+    def __init__(self):
+        self._calls = {}
+
+    async def do(
+        self, key: Hashable, func: Callable[..., Awaitable[T]], *args, **kwargs
+    ) -> T:
+        while (future := self._calls.get(key)) is not None:
+            try:
+                return await shield(future)
+            except CancelledError:
+                if not future.cancelled():  # this caller got cancelled
+                    raise
+
+        future = self._calls[key] = get_running_loop().create_future()
+        try:
+            result = await func(*args, **kwargs)
+        except CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # the first caller gets it raised already
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._calls[key]
+
+
 class GatherAnyError(Exception):
     idx: int
     exception: Exception
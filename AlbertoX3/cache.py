@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+
+__all__ = ("LocalCache",)
+
+
+from collections import OrderedDict
+from time import monotonic
+from typing import TYPE_CHECKING, Generic, TypeVar
+
+
+if TYPE_CHECKING:
+    from typing import Iterator, NoReturn, Optional, Tuple
+
+
+KT = TypeVar("KT")
+VT = TypeVar("VT")
+
+
+class LocalCache(Generic[KT, VT]):
+    """
+    Process-local LRU cache whose items expire after a fixed time.
+    """
+
+    MISSING = object()
+    """Returned by ``get`` if no default is given and nothing is cached"""
+
+    ttl: float
+    max_size: int
+    _data: OrderedDict[KT, Tuple[float, VT]]
+
+    def __init__(self, ttl: float, max_size: int = 1024):
+        """
+        Parameters
+        ----------
+        ttl: float
+            The amount of seconds an item stays valid.
+        max_size: int
+            The max amount of items, the least recently used ones get dropped first.
+        """
+        self.ttl = ttl
+        self.max_size = max_size
+        self._data = OrderedDict()
+
+    def get(self, key: KT, default: Optional[VT] = MISSING) -> VT:
+        if (item := self._data.get(key)) is None:
+            return default
+
+        expires, value = item
+        if expires < monotonic():
+            del self._data[key]
+            return default
+
+        self._data.move_to_end(key)
+        return value
+
+    def pop(self, key: KT, default: Optional[VT] = None) -> VT:
+        if (item := self._data.pop(key, None)) is None:
+            return default
+        return item[1]
+
+    def clear(self) -> NoReturn:
+        self._data.clear()
+
+    def __setitem__(self, key: KT, value: VT) -> NoReturn:
+        self._data[key] = monotonic() + self.ttl, value
+        self._data.move_to_end(key)
+        if len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+
+    def __contains__(self, key: KT) -> bool:
+        return self.get(key) is not LocalCache.MISSING
+
+    def __iter__(self) -> Iterator[KT]:
+        return iter(list(self._data))
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -10,7 +10,8 @@ __all__ = (
 
 from pathlib import Path
 from typing import TYPE_CHECKING
-from yaml import safe_load
+
+from .utils import load_yaml
 
 
 if TYPE_CHECKING:
@@ -51,11 +52,11 @@ class NestedInt(int):
 
 _colors_path = Path(__file__).parent / "colors"
 
-with open(_colors_path / "flat_ui.yml", encoding="utf-8") as f:
-    _color_data_flat_ui: Dict[str, int] = safe_load(f)
+_color_data_flat_ui: Dict[str, int] = load_yaml(_colors_path / "flat_ui.yml")
 
-with open(_colors_path / "material.yml", encoding="utf-8") as f:
-    _color_data_material: Dict[str, dict[str | int, int]] = safe_load(f)
+_color_data_material: Dict[str, dict[str | int, int]] = load_yaml(
+    _colors_path / "material.yml"
+)
 
 
 def _load_flat_ui(
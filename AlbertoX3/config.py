@@ -14,11 +14,10 @@ import re
 
 from pathlib import Path
 from typing import TYPE_CHECKING
-from yaml import safe_load
 
 from .contributor import Contributor
 from .types import PrimitiveScale, FormatStr
-from .utils import get_values, get_bool
+from .utils import get_values, get_bool, load_yaml
 
 
 if TYPE_CHECKING:
@@ -214,8 +213,7 @@ def load_config_file(path: Path) -> NoReturn:
     path: Path
         The path to the config-file.
     """
-    with path.open(encoding="utf-8") as f:
-        config = safe_load(f)
+    config = load_yaml(path, cache=False)
 
     load_bot(config)
     load_repo(config)
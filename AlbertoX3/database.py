@@ -4,8 +4,11 @@ from __future__ import annotations
 __all__ = (
     "select",
     "filter_by",
+    "get_statement",
+    "get_primary_key",
     "exists",
     "delete",
+    "update",
     "Base",
     "UTCDatetime",
     "DB",
@@ -14,25 +17,60 @@ __all__ = (
     "get_database",
     "db",
     "redis",
+    "redis_subscribe",
+    "redis_publish",
+    "redis_listen",
 )
 
 
 from aioredis import Redis
-from asyncio import Event
-from contextlib import asynccontextmanager
+from asyncio import Event, Task, current_task, sleep
+from contextlib import asynccontextmanager, suppress
 from contextvars import ContextVar
 from datetime import datetime, timezone
 from functools import wraps, partial
+from hashlib import sha256
+from itertools import count as counter
+from time import monotonic
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.engine import URL
+from sqlalchemy.exc import (
+    IntegrityError,
+    InterfaceError,
+    OperationalError,
+    ResourceClosedError,
+)
 from sqlalchemy.future import select as sa_select, Select
-from sqlalchemy.orm import selectinload, DeclarativeMeta, registry
+from sqlalchemy.orm import selectinload, DeclarativeMeta, Session, registry
+from sqlalchemy.schema import CreateIndex, CreateTable
 from sqlalchemy.sql import Executable
-from sqlalchemy.sql.expression import exists as sa_exists, delete as sa_delete, Delete
+from sqlalchemy.sql.expression import (
+    exists as sa_exists,
+    delete as sa_delete,
+    update as sa_update,
+    Delete,
+    Update,
+)
 from sqlalchemy.sql.functions import count
 from sqlalchemy.sql.selectable import Exists
-from sqlalchemy import TypeDecorator, DateTime, Table
-from typing import TYPE_CHECKING, TypeVar, Type
+from sqlalchemy import (
+    Column,
+    String,
+    TypeDecorator,
+    event,
+    DateTime,
+    Index,
+    Table,
+    UniqueConstraint,
+    bindparam,
+    inspect as sa_inspect,
+    text,
+    tuple_,
+)
+from typing import TYPE_CHECKING, Hashable, TypeVar, Type
 
 from AlbertUnruhUtils.utils.logger import get_logger
 
@@ -47,15 +85,35 @@ from .environment import (
     DB_POOL_SIZE,
     DB_POOL_MAX_OVERFLOW,
     DB_SHOW_SQL_STATEMENTS,
+    DB_REPLICAS,
+    DB_REPLICA_RETRY,
+    DB_SLOW_QUERY_THRESHOLD,
+    DB_SLOW_QUERY_BUFFER,
     REDIS_DB,
     REDIS_HOST,
     REDIS_PORT,
     REDIS_PASSWORD,
+    REDIS_PUBSUB,
 )
+from .instrumentation import DBMetrics
 
 
 if TYPE_CHECKING:
-    from typing import Optional, Any, NoReturn
+    from sqlalchemy.engine import Connection, Dialect, Inspector, Row
+    from sqlalchemy.orm import SessionTransaction
+    from typing import (
+        Optional,
+        Any,
+        Awaitable,
+        NoReturn,
+        Dict,
+        List,
+        Callable,
+        Iterable,
+        Sequence,
+        Set,
+        Tuple,
+    )
 
 
 T = TypeVar("T")
@@ -69,12 +127,97 @@ redis: Redis = Redis(
     password=REDIS_PASSWORD,
 )
 
+_redis_subscriptions: Dict[str, List[Callable[[str], Any]]] = {}
+
+
+def redis_subscribe(channel: str, callback: Callable[[str], Any]) -> NoReturn:
+    """
+    Registers a callback for messages published on a Redis channel.
+
+    Parameters
+    ----------
+    channel: str
+        The channel to subscribe to.
+    callback: Callable[[str], Any]
+        Gets called with every (decoded) message.
+    """
+    _redis_subscriptions.setdefault(channel, []).append(callback)
+
+
+async def redis_publish(channel: str, message: str) -> NoReturn:
+    """
+    Publishes a message to the other processes (if ``REDIS_PUBSUB`` is set).
+    """
+    if REDIS_PUBSUB:
+        await redis.publish(channel, message)
+
+
+async def redis_listen() -> NoReturn:
+    """
+    Dispatches published messages to the subscribed callbacks.
+
+    Notes
+    -----
+    Runs forever if ``REDIS_PUBSUB`` is set,
+    lost connections get resubscribed with an exponential backoff.
+    """
+    if not REDIS_PUBSUB or not _redis_subscriptions:
+        return
+
+    delay = 1
+    while True:
+        try:
+            async with redis.pubsub() as pubsub:
+                await pubsub.subscribe(*_redis_subscriptions)
+                delay = 1
+                async for message in pubsub.listen():
+                    if message["type"] != "message":
+                        continue
+
+                    channel = message["channel"].decode()
+                    data = message["data"].decode()
+                    for callback in _redis_subscriptions.get(channel, []):
+                        try:
+                            callback(data)
+                        except Exception as e:
+                            logger.warning(
+                                f"Unable to handle {data!r} from {channel!r}: {e!r}"
+                            )
+            logger.warning(f"Redis subscription ended, resubscribing in {delay}s")
+        except Exception as e:
+            logger.warning(
+                f"Redis subscription failed, resubscribing in {delay}s: {e!r}"
+            )
+
+        await sleep(delay)
+        delay = min(delay * 2, 60)
+
 
 # Note:
 # this file is "inspired" by https://github.com/PyDrocsid/library/blob/develop/PyDrocsid/database.py
 
 
+_statements: Dict[Hashable, Select] = {}
+"""Memoized statements of ``select`` and ``get_statement``"""
+
+
+def _options_key(args: Sequence[Any]) -> Tuple[Any, ...]:
+    return tuple(tuple(arg) if isinstance(arg, (tuple, list)) else arg for arg in args)
+
+
 def select(entity, *args) -> Select:
+    # only mapped classes and tables are memoized, other entities
+    # (e.g. ``count()``) are new objects on every call
+    if not isinstance(entity, (type, Table)):
+        return _select(entity, *args)
+
+    key = (entity, _options_key(args))
+    if (statement := _statements.get(key)) is None:
+        statement = _statements[key] = _select(entity, *args)
+    return statement
+
+
+def _select(entity, *args) -> Select:
     if not args:
         return sa_select(entity)
 
@@ -96,6 +239,47 @@ def filter_by(cls, *args, **kwargs) -> Select:
     return select(cls, *args).filter_by(**kwargs)
 
 
+def get_statement(cls, *args, keys: Tuple[str, ...]) -> Select:
+    """
+    Returns a memoized ``filter_by``-statement with bound parameters.
+
+    Parameters
+    ----------
+    cls
+        The entity to select.
+    *args
+        The relationships to load (see ``select``).
+    keys: Tuple[str, ...]
+        The columns to filter by, their values have to be passed as parameters
+        when executing the statement.
+
+    Returns
+    -------
+    Select
+    """
+    key = (cls, _options_key(args), keys)
+    if (statement := _statements.get(key)) is None:
+        statement = _statements[key] = select(cls, *args).filter_by(
+            **{k: bindparam(k) for k in keys}
+        )
+    return statement
+
+
+_primary_keys: Dict[type, Tuple[str, ...]] = {}
+
+
+def get_primary_key(cls: type) -> Tuple[str, ...]:
+    """
+    Returns the attribute names of the primary key of a model.
+    """
+    if (keys := _primary_keys.get(cls)) is None:
+        mapper = sa_inspect(cls)
+        keys = _primary_keys[cls] = tuple(
+            mapper.get_property_by_column(column).key for column in mapper.primary_key
+        )
+    return keys
+
+
 def exists(*entities, **kwargs) -> Exists:
     return sa_exists(*entities, **kwargs)
 
@@ -104,6 +288,10 @@ def delete(table) -> Delete:
     return sa_delete(table)
 
 
+def update(table) -> Update:
+    return sa_update(table)
+
+
 class Base(metaclass=DeclarativeMeta):
     __table__: Table
     __tablename__: str
@@ -113,10 +301,85 @@ class Base(metaclass=DeclarativeMeta):
 
     __table_args__ = {"mysql_collate": "utf8mb4_bin"}
 
+    __reference__ = False
+    """Whether the rows never change and ``DB.get`` may cache them process-wide"""
+
     def __init__(self, **kwargs: Any):
         self.registry.constructor(self, **kwargs)
 
 
+class SchemaModel(Base):
+    """
+    The fingerprints of the created tables (see ``DB.create_tables``).
+    """
+
+    __tablename__ = "schema_fingerprint"
+
+    name: Column | str = Column(String(64), primary_key=True, nullable=False)
+    fingerprint: Column | str = Column(String(64), nullable=False)
+
+    VERSION = 2
+    """Part of every fingerprint, increasing it checks every table again"""
+
+    @staticmethod
+    def fingerprint_of(table: Table, dialect: Dialect) -> str:
+        """
+        Hashes the DDL of a table (including its indexes).
+        """
+        ddl = [f"-- version {SchemaModel.VERSION}"]
+        ddl.append(str(CreateTable(table).compile(dialect=dialect)))
+        for index in sorted(table.indexes, key=lambda i: i.name or ""):
+            ddl.append(str(CreateIndex(index).compile(dialect=dialect)))
+        return sha256("\n".join(ddl).encode()).hexdigest()
+
+    @staticmethod
+    def missing(
+        inspector: Inspector, table: Table
+    ) -> Tuple[List[Index], List[UniqueConstraint]]:
+        """
+        Compares the indexes and unique constraints of a table with the live schema.
+
+        Parameters
+        ----------
+        inspector: Inspector
+            The inspector of the live schema.
+        table: Table
+            The table to compare.
+
+        Returns
+        -------
+        Tuple[List[Index], List[UniqueConstraint]]
+            The indexes and unique constraints missing in the live schema.
+
+        Notes
+        -----
+        Indexes and constraints are compared by their columns, not by their names.
+        """
+        unique = {tuple(column.name for column in table.primary_key.columns): True}
+        for index in inspector.get_indexes(table.name):
+            columns = tuple(index["column_names"])
+            unique[columns] = unique.get(columns, False) or bool(index["unique"])
+        for constraint in inspector.get_unique_constraints(table.name):
+            unique[tuple(constraint["column_names"])] = True
+
+        def columns_of(item: Index | UniqueConstraint) -> Tuple[str, ...]:
+            return tuple(column.name for column in item.columns)
+
+        indexes = [
+            index
+            for index in table.indexes
+            if columns_of(index) not in unique
+            or (index.unique and not unique[columns_of(index)])
+        ]
+        constraints = [
+            constraint
+            for constraint in table.constraints
+            if isinstance(constraint, UniqueConstraint)
+            and not unique.get(columns_of(constraint))
+        ]
+        return indexes, constraints
+
+
 class UTCDatetime(TypeDecorator):
     impl = DateTime
     cache_ok = True
@@ -136,14 +399,95 @@ class UTCDatetime(TypeDecorator):
         return datetime
 
 
+class _Context:
+    """
+    The state of a ``db_context``.
+    """
+
+    __slots__ = (
+        "session",
+        "close_event",
+        "task",
+        "depth",
+        "read",
+        "written",
+        "written_keys",
+        "savepoints",
+        "replica",
+        "replica_session",
+        "after_commit",
+    )
+
+    session: Optional[AsyncSession]
+    """Gets created on the first access of ``DB.session``"""
+    close_event: Optional[Event]
+    """Gets created on the first call of ``DB.wait_for_close_event``"""
+    task: Optional[Task]
+    """The task the context belongs to"""
+    depth: int
+    """The amount of entered (nested) ``db_context``s using this context"""
+    read: bool
+    """Whether reads may be sent to a replica (see ``DB.read``)"""
+    written: bool
+    """Whether something was written (pins every further read to the primary)"""
+    written_keys: Set[Hashable]
+    """The cache-keys written within this context (see ``DB.mark_written``)"""
+    savepoints: List[Optional[SessionTransaction]]
+    """The SAVEPOINTs of the nested ``db_context``s (``None`` until they write)"""
+    replica: Optional[AsyncEngine]
+    """The replica used by ``replica_session``"""
+    replica_session: Optional[AsyncSession]
+    """Gets created on the first read within ``DB.read``"""
+    after_commit: List[Callable[[], Awaitable]]
+    """Get called once the session is committed (see ``DB.after_commit``)"""
+
+    def __init__(self):
+        self.session = None
+        self.close_event = None
+        self.task = current_task()
+        self.depth = 0
+        self.read = False
+        self.written = False
+        self.written_keys = set()
+        self.savepoints = []
+        self.replica = None
+        self.replica_session = None
+        self.after_commit = []
+
+
+def _open_savepoints(session: Session) -> NoReturn:
+    """
+    Opens the SAVEPOINTs of the nested ``db_context``s which didn't write yet.
+    """
+    if (context := session.info.get("context")) is None:
+        return
+
+    context.written = True
+    for i, savepoint in enumerate(context.savepoints):
+        if savepoint is None:
+            context.savepoints[i] = session.begin_nested()
+
+
+@event.listens_for(Session, "before_flush")
+def _before_flush(session: Session, *_) -> NoReturn:
+    # ``begin_nested`` doesn't flush while flushing,
+    # so the changes of the flush end up within the new savepoints
+    _open_savepoints(session)
+
+
 class DB:
     """
     A database connection.
     """
 
     engine: AsyncEngine
-    _session: ContextVar[Optional[AsyncSession]]
-    _close_event: ContextVar[Optional[Event]]
+    replicas: List[AsyncEngine]
+    metrics: DBMetrics
+    replica_retry: float
+    _context: ContextVar[Optional[_Context]]
+    _unhealthy: Dict[AsyncEngine, float]
+    _references: Dict[Tuple[type, Tuple[Any, ...]], Base]
+    _ready: Event
 
     def __init__(
         self,
@@ -157,6 +501,10 @@ class DB:
         pool_size: int = 20,
         max_overflow: int = 20,
         echo: bool = False,
+        replicas: Sequence[Tuple[str, int]] = (),
+        replica_retry: float = 30,
+        slow_query_threshold: float = 0.2,
+        slow_query_buffer: int = 100,
     ):
         """
         Parameters
@@ -181,53 +529,286 @@ class DB:
             The max amount of connections to allow over the pool.
         echo: bool
             Whether SQL queries should be logged or not.
+        replicas: Sequence[Tuple[str, int]]
+            Host and port of every read-only replica.
+        replica_retry: float
+            The amount of seconds to skip a replica after a connection error.
+        slow_query_threshold: float
+            The amount of seconds after which a query counts as slow.
+        slow_query_buffer: int
+            The amount of slow queries to keep in ``metrics``.
         """
-        self.engine = create_async_engine(
-            URL.create(
-                drivername=driver,
-                username=username,
-                password=password,
-                host=host,
-                port=port,
-                database=database,
-            ),
-            pool_pre_ping=True,
-            pool_recycle=pool_recycle,
-            pool_size=pool_size,
-            max_overflow=max_overflow,
-            echo=echo,
-        )
 
-        self._session = ContextVar("session", default=None)
-        self._close_event = ContextVar("close_event", default=None)
-
-    async def create_tables(self) -> NoReturn:
+        def create_engine(host_: str, port_: int) -> AsyncEngine:
+            return create_async_engine(
+                URL.create(
+                    drivername=driver,
+                    username=username,
+                    password=password,
+                    host=host_,
+                    port=port_,
+                    database=database,
+                ),
+                pool_pre_ping=True,
+                pool_recycle=pool_recycle,
+                pool_size=pool_size,
+                max_overflow=max_overflow,
+                echo=echo,
+            )
+
+        self.engine = create_engine(host, port)
+        self.replicas = [create_engine(*replica) for replica in replicas]
+        self.replica_retry = replica_retry
+
+        self.metrics = DBMetrics(slow_query_threshold, slow_query_buffer)
+        self.metrics.instrument(self.engine, "primary")
+        for (replica_host, replica_port), replica in zip(replicas, self.replicas):
+            self.metrics.instrument(replica, f"replica {replica_host}:{replica_port}")
+
+        self._context = ContextVar("context", default=None)
+        self._unhealthy = {}
+        self._references = {}
+        self._ready = Event()
+        self._replica_index = counter()
+
+    async def create_tables(self, force: bool = False) -> NoReturn:
         """
         Creates all tables for the scales.
+
+        Parameters
+        ----------
+        force: bool
+            Whether every table should be checked, even if its fingerprint matches.
+
+        Notes
+        -----
+        Only tables whose fingerprint (see ``SchemaModel``) differs from the stored one
+        get checked and created. Existing tables only get their missing indexes and
+        unique constraints added (columns are never altered),
+        the fingerprint is only stored once the live schema matches,
+        otherwise the table gets checked on every start.
         """
-        tables = [d.__table__ for d in Base.__subclasses__()]  # type: ignore
+        async with self.engine.begin() as conn:
+            await conn.run_sync(partial(self._create_tables, force=force))
+
+        self._ready.set()
+
+    @staticmethod
+    def _create_tables(conn: Connection, force: bool = False) -> NoReturn:
+        tables = Base.metadata.sorted_tables
+        fingerprints = {
+            table.name: SchemaModel.fingerprint_of(table, conn.dialect)
+            for table in tables
+        }
+
+        stored = {}
+        if not force and sa_inspect(conn).has_table(SchemaModel.__tablename__):
+            stored = dict(
+                conn.execute(sa_select(SchemaModel.name, SchemaModel.fingerprint)).all()
+            )
+
+        tables = [t for t in tables if stored.get(t.name) != fingerprints[t.name]]
+        if not tables:
+            logger.debug("Schema is unchanged, skipping the creation of tables")
+            return
 
         logger.debug(
             f"Creating following tables (if they don't exist): "
             f"{', '.join(map(lambda t: t.name, tables))}"
         )
 
-        async with self.engine.begin() as conn:
-            await conn.run_sync(partial(Base.metadata.create_all, tables=tables))
+        Base.metadata.create_all(conn, tables=tables)
+
+        # ``create_all`` skips existing tables, even if they miss something
+        inspector = sa_inspect(conn)
+        names = []
+        for table in tables:
+            indexes, constraints = SchemaModel.missing(inspector, table)
+            if indexes or constraints:
+                for index in indexes:
+                    logger.info(f"Adding index {index.name!r} to {table.name!r}")
+                    index.create(conn, checkfirst=True)
+                for constraint in constraints:
+                    DB._add_unique_constraint(conn, table, constraint)
+                indexes, constraints = SchemaModel.missing(sa_inspect(conn), table)
+            if not indexes and not constraints:
+                names.append(table.name)
+                continue
+            missing = [f"index {index.name!r}" for index in indexes] + [
+                f"unique constraint on {', '.join(c.name for c in constraint.columns)}"
+                for constraint in constraints
+            ]
+            logger.warning(
+                f"Table {table.name!r} is missing following "
+                f"(it has to be migrated manually): {'; '.join(missing)}"
+            )
+
+        schema = SchemaModel.__table__
+        conn.execute(sa_delete(schema).where(schema.c.name.in_(names)))
+        conn.execute(
+            schema.insert(),
+            [{"name": name, "fingerprint": fingerprints[name]} for name in names],
+        )
+
+    @staticmethod
+    def _add_unique_constraint(
+        conn: Connection, table: Table, constraint: UniqueConstraint
+    ) -> NoReturn:
+        """
+        Adds a unique constraint (as unique index) to an existing table.
+
+        Raises
+        ------
+        RuntimeError
+            If the table contains duplicates.
+
+        Notes
+        -----
+        Upserts rely on these constraints,
+        without them they would insert duplicates instead.
+        Unlike ``ALTER TABLE ... ADD CONSTRAINT`` unique indexes are supported by every
+        dialect and are used by ``ON DUPLICATE KEY`` and ``ON CONFLICT`` as well.
+        """
+        preparer = conn.dialect.identifier_preparer
+        columns = [column.name for column in constraint.columns]
+        name = constraint.name or f"{table.name}_{'_'.join(columns)}_key"
+
+        logger.info(f"Adding unique constraint {name!r} to {table.name!r}")
+        try:
+            conn.execute(
+                text(
+                    f"CREATE UNIQUE INDEX {preparer.quote(name)} "
+                    f"ON {preparer.format_table(table)} "
+                    f"({', '.join(map(preparer.quote, columns))})"
+                )
+            )
+        except IntegrityError as e:
+            raise RuntimeError(
+                f"Can't add the unique constraint {name!r} to {table.name!r}, "
+                f"duplicates of ({', '.join(columns)}) have to be merged first!"
+            ) from e
+
+    async def ready(self) -> NoReturn:
+        """
+        Waits until ``create_tables`` has created every table.
+        """
+        await self._ready.wait()
 
     async def add(self, obj: T) -> T:
+        self._context.get().written = True
+        self._forget_reference(obj)
         self.session.add(obj)
         return obj
 
     async def delete(self, obj: T) -> T:
+        self._context.get().written = True
+        self._forget_reference(obj)
         await self.session.delete(obj)
         return obj
 
+    async def add_all(self, objs: Iterable[T]) -> List[T]:
+        """
+        Adds many objects at once (inserted with one ``executemany`` per model).
+        """
+        self._context.get().written = True
+        objs = list(objs)
+        for obj in objs:
+            self._forget_reference(obj)
+        self.session.add_all(objs)
+        return objs
+
+    def _forget_reference(self, obj: Base) -> NoReturn:
+        if (cls := type(obj)).__reference__:
+            identity = tuple(getattr(obj, key) for key in get_primary_key(cls))
+            self._references.pop((cls, identity), None)
+
     async def exec(self, statement: Executable, *args, **kwargs):
-        return await self.session.execute(statement, *args, **kwargs)
+        return await self._execute("execute", statement, *args, **kwargs)
 
-    async def stream(self, statement: Executable, *args, **kwargs):
-        return (await self.session.stream(statement, *args, **kwargs)).scalars()
+    async def stream(
+        self, statement: Executable, *args, scalars: bool = True, **kwargs
+    ):
+        result = await self._execute("stream", statement, *args, **kwargs)
+        return result.scalars() if scalars else result
+
+    @asynccontextmanager
+    async def read(self):
+        """
+        Sends the reads of the enclosed code to a replica (if configured).
+
+        Notes
+        -----
+        Once something was written within the ``db_context``
+        every further read uses the primary to keep read-your-writes.
+        No SAVEPOINT is opened, a failure is left to the enclosing ``db_context``.
+        Objects loaded from a replica must not be modified.
+        """
+        async with db_context(savepoint=False):
+            context = self._context.get()
+            read, context.read = context.read, True
+            try:
+                yield
+            finally:
+                context.read = read
+
+    def _next_replica(self) -> Optional[AsyncEngine]:
+        now = monotonic()
+        for _ in range(len(self.replicas)):
+            replica = self.replicas[next(self._replica_index) % len(self.replicas)]
+            if self._unhealthy.get(replica, 0) <= now:
+                return replica
+        return None
+
+    def _reader(self) -> Optional[AsyncSession]:
+        """
+        Returns the replica-session to read from (if any).
+        """
+        context = self._context.get()
+        if context is None or not context.read or context.written:
+            return None
+
+        if (session := context.session) is not None and (
+            session.new or session.dirty or session.deleted
+        ):
+            return None
+
+        if context.replica_session is None:
+            if (replica := self._next_replica()) is None:
+                return None
+            context.replica = replica
+            context.replica_session = AsyncSession(replica, expire_on_commit=False)
+        return context.replica_session
+
+    async def _execute(self, method: str, statement: Executable, *args, **kwargs):
+        if not getattr(statement, "is_select", False) or (
+            getattr(statement, "_for_update_arg", None) is not None
+        ):
+            context = self._context.get()
+            context.written = True
+            session = self.session
+            if None in context.savepoints:
+                await session.flush()
+                await session.run_sync(_open_savepoints)
+            return await getattr(session, method)(statement, *args, **kwargs)
+
+        return await self._read(method, statement, *args, **kwargs)
+
+    async def _read(self, method: str, *args, **kwargs):
+        if (session := self._reader()) is not None:
+            try:
+                return await getattr(session, method)(*args, **kwargs)
+            except (InterfaceError, OperationalError, OSError) as e:
+                context = self._context.get()
+                logger.warning(
+                    f"Replica {context.replica.url.host!r} is unhealthy, "
+                    f"using the primary for {self.replica_retry}s: {e!r}"
+                )
+                self._unhealthy[context.replica] = monotonic() + self.replica_retry
+                with suppress(Exception):
+                    await context.replica_session.close()
+                context.replica = context.replica_session = None
+
+        return await getattr(self.session, method)(*args, **kwargs)
 
     async def all(self, statement: Executable, *args, **kwargs):
         return [x async for x in await self.stream(statement, *args, **kwargs)]
@@ -242,38 +823,379 @@ class DB:
         return await self.first(select(count()).select_from(*args, **kwargs))
 
     async def get(self, cls: Type[T], *args, **kwargs) -> T | None:
-        return await self.first(filter_by(cls, *args, **kwargs))
+        """
+        Returns the first row matching ``kwargs``.
+
+        Notes
+        -----
+        Lookups by exactly the primary key are served from the identity map
+        of the session if possible.
+        Rows of models with ``__reference__`` are additionally cached process-wide
+        and shared between sessions, they therefore mustn't be modified.
+        """
+        if not args and kwargs.keys() == set(keys := get_primary_key(cls)):
+            identity = tuple(kwargs[key] for key in keys)
+            if not cls.__reference__:
+                return await self._read("get", cls, identity)
+
+            if (obj := self._references.get((cls, identity))) is None:
+                obj = await self._read("get", cls, identity)
+                if obj is not None and sa_inspect(obj).persistent:
+                    self._references[(cls, identity)] = obj
+            return obj
+
+        statement = get_statement(cls, *args, keys=tuple(kwargs))
+        return await self.first(statement, kwargs)
+
+    async def get_many(
+        self, cls: Type[T], keys: Iterable[Any], *, chunk_size: int = 500
+    ) -> Dict[Any, T]:
+        """
+        Returns the rows of many primary keys.
+
+        Parameters
+        ----------
+        cls: Type[T]
+            The model to select.
+        keys: Iterable[Any]
+            The primary keys (tuples for composite primary keys).
+        chunk_size: int
+            The maximum amount of keys per ``IN``-query.
+
+        Returns
+        -------
+        Dict[Any, T]
+            The found rows by their primary key.
+        """
+        names = get_primary_key(cls)
+        composite = len(names) > 1
+        columns = [getattr(cls, name) for name in names]
+        column = tuple_(*columns) if composite else columns[0]
+
+        found: Dict[Any, T] = {}
+        missing = []
+        for key in dict.fromkeys(keys):
+            identity = key if composite else (key,)
+            if cls.__reference__ and (obj := self._references.get((cls, identity))):
+                found[key] = obj
+            else:
+                missing.append(key)
+
+        for i in range(0, len(missing), chunk_size):
+            statement = select(cls).where(column.in_(missing[i : i + chunk_size]))
+            for obj in await self.all(statement):
+                identity = tuple(getattr(obj, name) for name in names)
+                found[identity if composite else identity[0]] = obj
+                if cls.__reference__:
+                    self._references[(cls, identity)] = obj
+
+        return found
+
+    async def bulk_upsert(
+        self, cls: Type[T], rows: Sequence[Dict[str, Any]], *, chunk_size: int = 500
+    ) -> NoReturn:
+        """
+        Inserts many rows or replaces the existing ones (by primary key).
+
+        Parameters
+        ----------
+        cls: Type[T]
+            The model to upsert into.
+        rows: Sequence[Dict[str, Any]]
+            The rows, every row needs the same columns.
+        chunk_size: int
+            The maximum amount of rows per statement.
+
+        Raises
+        ------
+        NotImplementedError
+            If the dialect doesn't support upserts.
+        """
+        if not rows:
+            return
+
+        table = cls.__table__  # type: ignore
+        dialect = self.engine.dialect.name
+        index = [column.name for column in table.primary_key.columns]
+        values = [k for k in rows[0] if k not in index]
+
+        for i in range(0, len(rows), chunk_size):
+            chunk = rows[i : i + chunk_size]
+            match dialect:
+                case "mysql" | "mariadb":
+                    statement = mysql_insert(table).values(chunk)
+                    new = statement.inserted
+                    # updating the primary key with itself to ignore duplicates
+                    statement = statement.on_duplicate_key_update(
+                        {k: new[k] for k in values or index}
+                    )
+                case "postgresql" | "sqlite":
+                    insert = (
+                        postgresql_insert if dialect == "postgresql" else sqlite_insert
+                    )
+                    statement = insert(table).values(chunk)
+                    new = statement.excluded
+                    if values:
+                        statement = statement.on_conflict_do_update(
+                            index_elements=index, set_={k: new[k] for k in values}
+                        )
+                    else:
+                        statement = statement.on_conflict_do_nothing()
+                case _:
+                    raise NotImplementedError(
+                        f"Upserts aren't supported for {dialect!r}!"
+                    )
+
+            await self.exec(statement)
+
+        if cls.__reference__:
+            for key in [key for key in self._references if key[0] is cls]:
+                del self._references[key]
+
+    async def upsert_increment(
+        self,
+        cls: Type[T],
+        index: Dict[str, Any],
+        values: Dict[str, int],
+        *,
+        relative: bool = True,
+        returning: bool = True,
+    ) -> Optional[Row]:
+        """
+        Atomically inserts a row or adds ``values`` to the existing one.
+
+        Parameters
+        ----------
+        cls: Type[T]
+            The model to upsert into.
+        index: Dict[str, Any]
+            The columns of a unique constraint and their values to identify the row.
+        values: Dict[str, int]
+            The columns to increment and the amount to add.
+        relative: bool
+            Whether ``values`` should be added to the stored values or replace them.
+        returning: bool
+            Whether the new values should be returned.
+
+        Returns
+        -------
+        Row, optional
+            The new values (if ``returning`` is set).
+
+        Raises
+        ------
+        NotImplementedError
+            If the dialect doesn't support upserts.
+
+        Notes
+        -----
+        Non-nullable columns missing in ``index`` and ``values`` need a default.
+        """
+        table = cls.__table__  # type: ignore
+        dialect = self.engine.dialect.name
+
+        match dialect:
+            case "mysql" | "mariadb":
+                statement = mysql_insert(table).values(**index, **values)
+                new = statement.inserted
+                statement = statement.on_duplicate_key_update(
+                    {k: table.c[k] + new[k] if relative else new[k] for k in values}
+                )
+            case "postgresql" | "sqlite":
+                insert = postgresql_insert if dialect == "postgresql" else sqlite_insert
+                statement = insert(table).values(**index, **values)
+                new = statement.excluded
+                statement = statement.on_conflict_do_update(
+                    index_elements=list(index),
+                    set_={
+                        k: table.c[k] + new[k] if relative else new[k] for k in values
+                    },
+                )
+            case _:
+                raise NotImplementedError(f"Upserts aren't supported for {dialect!r}!")
+
+        columns = [table.c[k] for k in values]
+
+        # pending objects (e.g. of a get-or-create) would be inserted a second time
+        # by the next autoflush if the upsert already inserted their row
+        await self.session.flush()
+
+        row = None
+        if returning and dialect == "postgresql":
+            row = (await self.exec(statement.returning(*columns))).one()
+        else:
+            await self.exec(statement)
+            if returning:
+                # the row is locked by the upsert until the transaction ends,
+                # so reading it in the same transaction returns the new values
+                row = (await self.exec(sa_select(*columns).filter_by(**index))).one()
+
+        # loaded objects of the row still hold the old values
+        for obj in list(self.session.identity_map.values()):
+            state = sa_inspect(obj)
+            if type(obj) is cls and all(
+                state.dict.get(k) == v for k, v in index.items()
+            ):
+                await self.session.refresh(obj)
+
+        return row
+
+    async def after_commit(self, callback: Callable[[], Awaitable]) -> NoReturn:
+        """
+        Calls ``callback`` once the current ``db_context`` is committed.
+
+        Parameters
+        ----------
+        callback: Callable[[], Awaitable]
+            E.g. the invalidation of a cache,
+            which could otherwise be refilled with the old values by concurrent reads.
+
+        Notes
+        -----
+        Outside a ``db_context`` the callback is called immediately,
+        callbacks of failed nested contexts are dropped together with their changes.
+        """
+        if (context := self._context.get()) is None:
+            await callback()
+        else:
+            context.after_commit.append(callback)
+
+    def mark_written(self, key: Hashable) -> NoReturn:
+        """
+        Marks a cached value as changed within the current ``db_context``.
+
+        Parameters
+        ----------
+        key: Hashable
+            The key of the cached value.
+
+        Notes
+        -----
+        Until the commit shared caches still hold the committed value,
+        so reads of marked keys (see ``is_written``) should use the session instead.
+        """
+        if (context := self._context.get()) is not None:
+            context.written_keys.add(key)
+
+    def is_written(self, key: Hashable) -> bool:
+        """
+        Returns whether ``key`` was marked by ``mark_written`` within this context.
+        """
+        return (context := self._context.get()) is not None and (
+            key in context.written_keys
+        )
 
     async def commit(self) -> NoReturn:
-        if self._session.get():
-            await self.session.commit()
+        if (context := self._context.get()) and context.session:
+            await context.session.commit()
 
     async def close(self) -> NoReturn:
-        if self._session.get():
-            await self.session.close()
-            self._close_event.get().set()
-
-    def create_session(self) -> AsyncSession:
-        self._session.set(session := AsyncSession(self.engine, expire_on_commit=False))
-        self._close_event.set(Event())
-        return session
+        if (context := self._context.get()) is None:
+            return
+
+        if context.replica_session:
+            await context.replica_session.close()
+            context.replica = context.replica_session = None
+        if context.session:
+            await context.session.close()
+            context.session = None
+        if context.close_event:
+            context.close_event.set()
 
     @property
-    def session(self) -> AsyncSession:
-        return self._session.get()
+    def session(self) -> Optional[AsyncSession]:
+        if (context := self._context.get()) is None:
+            return None
+
+        if context.session is None:
+            context.session = AsyncSession(
+                self.engine, expire_on_commit=False, info={"context": context}
+            )
+        return context.session
 
     async def wait_for_close_event(self):
-        await self._close_event.get().wait()
+        if (context := self._context.get()).close_event is None:
+            context.close_event = Event()
+        await context.close_event.wait()
 
 
 @asynccontextmanager
-async def db_context():
-    db.create_session()
+async def db_context(new: bool = False, savepoint: bool = True):
+    """
+    Provides ``db.session`` for the enclosed code.
+
+    Parameters
+    ----------
+    new: bool
+        Whether a separate session should be used even inside another context.
+    savepoint: bool
+        Whether a failure of a nested context should only roll back its own changes,
+        otherwise the failure is left to the outer context.
+
+    Notes
+    -----
+    The session is only created on the first access of ``db.session``,
+    contexts without any database access therefore neither commit nor close anything.
+    Nested contexts of the same task reuse the outer session,
+    which is committed when the outermost context exits.
+    If a nested context fails, only its own changes are rolled back. The SAVEPOINT
+    for this is opened lazily before its first write, so nested contexts which
+    only read don't cost any additional round trips.
+    """
+    context = db._context.get()
+    if new or context is None or context.task is not current_task():
+        context = _Context()
+        token = db._context.set(context)
+    else:
+        token = None
+
+    nested = token is None and savepoint
+    if nested:
+        if (session := context.session) is not None and (
+            session.new or session.dirty or session.deleted
+        ):
+            # pending changes of the outer context must stay out of the savepoint
+            await session.flush()
+        context.savepoints.append(None)
+
+    callbacks = len(context.after_commit)
+    context.depth += 1
     try:
         yield
+    except BaseException:
+        if nested:
+            del context.after_commit[callbacks:]
+            if (transaction := context.savepoints.pop()) is not None:
+                # a commit of the whole session already closed it
+                with suppress(ResourceClosedError):
+                    await context.session.run_sync(lambda _: transaction.rollback())
+            elif (session := context.session) is not None:
+                # nothing was flushed yet, so only the pending changes get discarded
+                for obj in [*session.new, *session.deleted]:
+                    session.expunge(obj)
+                for obj in session.dirty:
+                    session.expire(obj)
+        raise
+    else:
+        if nested:
+            if (transaction := context.savepoints.pop()) is not None and (
+                transaction.is_active
+            ):
+                await context.session.run_sync(lambda _: transaction.commit())
     finally:
-        await db.commit()
-        await db.close()
+        context.depth -= 1
+        if not context.depth:
+            try:
+                await db.commit()
+            finally:
+                await db.close()
+                db._context.reset(token)
+
+            for callback in context.after_commit:
+                try:
+                    await callback()
+                except Exception as e:
+                    logger.warning(f"After-commit callback {callback!r} failed: {e!r}")
 
 
 def db_wrapper(func: T) -> T:
@@ -300,6 +1222,16 @@ def get_database() -> DB:
         pool_size=DB_POOL_SIZE,
         max_overflow=DB_POOL_MAX_OVERFLOW,
         echo=DB_SHOW_SQL_STATEMENTS,
+        replicas=[
+            (host, int(port or DB_PORT))
+            for host, _, port in (
+                replica.strip().partition(":") for replica in DB_REPLICAS.split(",")
+            )
+            if host
+        ],
+        replica_retry=DB_REPLICA_RETRY,
+        slow_query_threshold=DB_SLOW_QUERY_THRESHOLD,
+        slow_query_buffer=DB_SLOW_QUERY_BUFFER,
     )
 
 
@@ -14,11 +14,19 @@ __all__ = (
     "DB_POOL_SIZE",
     "DB_POOL_MAX_OVERFLOW",
     "DB_SHOW_SQL_STATEMENTS",
+    "DB_REPLICAS",
+    "DB_REPLICA_RETRY",
+    "DB_SLOW_QUERY_THRESHOLD",
+    "DB_SLOW_QUERY_BUFFER",
     "CACHE_TTL",
+    "LOCAL_CACHE_TTL",
+    "STATS_FLUSH_INTERVAL",
     "REDIS_HOST",
     "REDIS_PORT",
     "REDIS_DB",
     "REDIS_PASSWORD",
+    "REDIS_PUBSUB",
+    "TRANSLATIONS_LAZY",
 )
 
 
@@ -51,9 +59,21 @@ DB_POOL_MAX_OVERFLOW = int(getenv("DB_POOL_MAX_OVERFLOW", 20))
 
 DB_SHOW_SQL_STATEMENTS = get_bool(getenv("DB_SHOW_SQL_STATEMENTS", False))
 
+DB_REPLICAS = getenv("DB_REPLICAS", "")
+DB_REPLICA_RETRY = float(getenv("DB_REPLICA_RETRY", 30))
+
+DB_SLOW_QUERY_THRESHOLD = float(getenv("DB_SLOW_QUERY_THRESHOLD", 0.2))
+DB_SLOW_QUERY_BUFFER = int(getenv("DB_SLOW_QUERY_BUFFER", 100))
+
 CACHE_TTL = int(getenv("CACHE_TTL", 3600))
+LOCAL_CACHE_TTL = int(getenv("LOCAL_CACHE_TTL", 60))
+
+STATS_FLUSH_INTERVAL = float(getenv("STATS_FLUSH_INTERVAL", 30))
 
 REDIS_HOST = getenv("REDIS_HOST", "localhost")
 REDIS_PORT = int(getenv("REDIS_PORT", 6379))
 REDIS_DB = int(getenv("REDIS_DB", 0))
 REDIS_PASSWORD = getenv("REDIS_PASSWORD", "")
+REDIS_PUBSUB = get_bool(getenv("REDIS_PUBSUB", False))
+
+TRANSLATIONS_LAZY = get_bool(getenv("TRANSLATIONS_LAZY", False))
@@ -18,9 +18,21 @@ DB_POOL_MAX_OVERFLOW: int
 
 DB_SHOW_SQL_STATEMENTS: bool
 
+DB_REPLICAS: str
+DB_REPLICA_RETRY: float
+
+DB_SLOW_QUERY_THRESHOLD: float
+DB_SLOW_QUERY_BUFFER: int
+
 CACHE_TTL: int
+LOCAL_CACHE_TTL: int
+
+STATS_FLUSH_INTERVAL: float
 
 REDIS_HOST: str
 REDIS_PORT: int
 REDIS_DB: int
 REDIS_PASSWORD: str
+REDIS_PUBSUB: bool
+
+TRANSLATIONS_LAZY: bool
@@ -1,24 +1,29 @@
 from __future__ import annotations
 
 
-__all__ = ("apply_block_events_adapter",)
+__all__ = (
+    "BlockedUserModel",
+    "apply_block_events_adapter",
+)
 
 
+from functools import partial
 from sqlalchemy import Column, BigInteger
+from time import perf_counter
 from typing import TYPE_CHECKING
 
 from naff.api.events import RawGatewayEvent
-from naff.client.utils import TTLCache
 
 from AlbertUnruhUtils.utils.logger import get_logger
 
-from .database import Base, db, db_context
-from .stats import DailyStatsModel
+from .database import Base, db, redis_publish, redis_subscribe, select
+from .instrumentation import current_command
+from .stats import stats_aggregator
 
 
 if TYPE_CHECKING:
     from naff import Client
-    from typing import Callable, Coroutine
+    from typing import Callable, Coroutine, NoReturn, Set
 
 
 logger = get_logger(__name__.split(".")[-1], level=None, add_handler=False)
@@ -34,14 +39,26 @@ class BlockedUserModel(Base):
         BigInteger, primary_key=True, unique=True, nullable=False
     )
 
-    CACHE: TTLCache[int, bool] = TTLCache()
-    """True if blocked"""
+    BLOCKED: Set[int] = set()
+    """Every blocked user (filled by ``load``)"""
+
+    CHANNEL = "blocked_user"
+
+    @staticmethod
+    async def load() -> NoReturn:
+        """
+        Loads every blocked user into ``BLOCKED``.
+        """
+        users = await db.all(select(BlockedUserModel.user))
+        BlockedUserModel.BLOCKED.clear()
+        BlockedUserModel.BLOCKED.update(users)
+        logger.info(f"Loaded {len(users)} blocked users")
 
     @staticmethod
     async def block(user: int) -> bool:
-        if not await BlockedUserModel.is_blocked(user):
+        if not BlockedUserModel.is_blocked(user):
             await db.add(BlockedUserModel(user=user))
-            BlockedUserModel.CACHE[user] = True
+            await db.after_commit(partial(BlockedUserModel._publish, f"block:{user}"))
             logger.info(f"Blocked {user} for future events")
             return True
         else:
@@ -49,21 +66,39 @@ class BlockedUserModel(Base):
 
     @staticmethod
     async def unblock(user: int) -> bool:
-        if await BlockedUserModel.is_blocked(user):
+        if BlockedUserModel.is_blocked(user):
             await db.delete(await db.get(BlockedUserModel, user=user))
-            BlockedUserModel.CACHE[user] = False
+            await db.after_commit(partial(BlockedUserModel._publish, f"unblock:{user}"))
             logger.info(f"Unblocked {user} for future events")
             return True
         else:
             return False
 
     @staticmethod
-    async def is_blocked(user: int) -> bool:
-        if (is_blocked := BlockedUserModel.CACHE.get(user)) is not None:
-            return is_blocked
-        is_blocked = await db.get(BlockedUserModel, user=user) is not None
-        BlockedUserModel.CACHE[user] = is_blocked
-        return is_blocked
+    def is_blocked(user: int) -> bool:
+        return user in BlockedUserModel.BLOCKED
+
+    @staticmethod
+    async def _publish(message: str) -> NoReturn:
+        """
+        Applies a committed ``block``/``unblock`` to this and every other process.
+        """
+        BlockedUserModel.on_message(message)
+        await redis_publish(BlockedUserModel.CHANNEL, message)
+
+    @staticmethod
+    def on_message(message: str) -> NoReturn:
+        """
+        Applies a ``block``/``unblock`` from another process.
+        """
+        action, _, user = message.partition(":")
+        if action == "block":
+            BlockedUserModel.BLOCKED.add(int(user))
+        elif action == "unblock":
+            BlockedUserModel.BLOCKED.discard(int(user))
+
+
+redis_subscribe(BlockedUserModel.CHANNEL, BlockedUserModel.on_message)
 
 
 class BlockEventsAdapter:
@@ -93,14 +128,19 @@ class BlockEventsAdapter:
             if (tmp := tmp.get("id")) is not None:
                 collected.add(tmp)
 
-        async with db_context():
-            for id in collected:  # noqa
-                if await BlockedUserModel.is_blocked(int(id)):
-                    logger.debug(f"Blocked dispatching Event: {event.resolved_name}")
-                    return
-            await DailyStatsModel.incr_events()  # sneak it into the new session ^^
-
-        await self.processor(event)
+        if collected and not BlockedUserModel.BLOCKED.isdisjoint(map(int, collected)):
+            logger.debug(f"Blocked dispatching Event: {event.resolved_name}")
+            return
+
+        token = current_command.set(f"event:{event.resolved_name}")
+        start = perf_counter()
+        try:
+            await self.processor(event)
+        finally:
+            stats_aggregator.record(
+                "event", event.resolved_name, perf_counter() - start
+            )
+            current_command.reset(token)
 
 
 def apply_block_events_adapter(bot: Client):
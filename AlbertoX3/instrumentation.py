@@ -0,0 +1,331 @@
+from __future__ import annotations
+
+
+__all__ = (
+    "current_command",
+    "normalize_sql",
+    "LATENCY_BUCKETS",
+    "latency_bucket",
+    "latency_percentile",
+    "Histogram",
+    "SlowQuery",
+    "DBMetrics",
+)
+
+
+import re
+
+from collections import deque
+from contextvars import ContextVar
+from math import ceil, log2
+from time import perf_counter, time
+from typing import TYPE_CHECKING, NamedTuple, Optional
+
+from sqlalchemy import event
+from sqlalchemy.pool import QueuePool
+
+
+if TYPE_CHECKING:
+    from sqlalchemy.engine import Connection, ExceptionContext
+    from sqlalchemy.ext.asyncio import AsyncEngine
+    from sqlalchemy.pool import Pool
+    from typing import Any, Deque, Dict, List, NoReturn, Sequence, Tuple
+
+
+current_command: ContextVar[Optional[str]] = ContextVar("current_command", default=None)
+"""The command (or event) which is currently processed"""
+
+
+_PARAMETER = r"\s*(?:%s|\?|:\w+|\$\d+)\s*"
+_PARAMETERS = re.compile(rf"\((?:{_PARAMETER},)+{_PARAMETER}\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_sql(statement: str, length: int = 256) -> str:
+    """
+    Normalizes a statement to group it with similar ones.
+
+    Parameters
+    ----------
+    statement: str
+        The statement as sent to the database (with placeholders).
+    length: int
+        The statement gets cut after this amount of characters.
+
+    Returns
+    -------
+    str
+        The statement with collapsed whitespace and parameter-lists
+        (e.g. ``IN (?, ?, ?)`` becomes ``IN (...)``).
+    """
+    statement = _WHITESPACE.sub(" ", statement).strip()
+    return _PARAMETERS.sub("(...)", statement)[:length]
+
+
+LATENCY_BUCKETS: Tuple[int, ...] = tuple(2**i for i in range(11))
+"""Upper bounds (in milliseconds) of the latency buckets, the last bucket is unbounded"""
+
+
+def latency_bucket(latency: float) -> int:
+    """
+    Parameters
+    ----------
+    latency: float
+        The latency in seconds.
+
+    Returns
+    -------
+    int
+        The index of the latency's bucket (``len(LATENCY_BUCKETS)`` if unbounded).
+    """
+    ms = latency * 1000
+    return 0 if ms <= 1 else min(ceil(log2(ms)), len(LATENCY_BUCKETS))
+
+
+def latency_percentile(buckets: Sequence[int], percentile: float) -> Optional[int]:
+    """
+    Returns the upper bound (in milliseconds) of the percentile's bucket.
+
+    Parameters
+    ----------
+    buckets: Sequence[int]
+        The amount of latencies per bucket (including the unbounded one).
+    percentile: float
+        The percentile to get (from ``0`` to ``100``).
+
+    Returns
+    -------
+    int, optional
+        ``None`` if it's within the unbounded bucket.
+    """
+    target = sum(buckets) * percentile / 100
+    seen = 0
+    for bound, amount in zip(LATENCY_BUCKETS, buckets):
+        seen += amount
+        if seen >= target:
+            return bound
+    return None
+
+
+class Histogram:
+    """
+    A latency histogram with the buckets of ``LATENCY_BUCKETS``.
+    """
+
+    __slots__ = ("count", "total", "buckets")
+
+    count: int
+    total: float
+    """The sum of all latencies in seconds"""
+    buckets: List[int]
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def add(self, latency: float) -> NoReturn:
+        """
+        Parameters
+        ----------
+        latency: float
+            The latency in seconds.
+        """
+        self.count += 1
+        self.total += latency
+        self.buckets[latency_bucket(latency)] += 1
+
+    @property
+    def avg(self) -> float:
+        """
+        The average latency in milliseconds.
+        """
+        return self.total / self.count * 1000 if self.count else 0
+
+    def percentile(self, percentile: float) -> Optional[int]:
+        """
+        See ``latency_percentile``.
+        """
+        return latency_percentile(self.buckets, percentile)
+
+
+SlowQuery = NamedTuple(
+    "SlowQuery",
+    (
+        ("timestamp", float),
+        ("latency", float),
+        ("statement", str),
+        ("command", Optional[str]),
+    ),
+)
+
+
+class DBMetrics:
+    """
+    Collects connection-pool and query metrics of instrumented engines.
+
+    Notes
+    -----
+    Everything is kept in memory and starts over with every restart.
+    """
+
+    slow_query_threshold: float
+    """Queries taking at least this amount of seconds are kept in ``slow_queries``"""
+    slow_queries: Deque[SlowQuery]
+    """The latest slow queries (a ring buffer)"""
+    statements: Dict[str, Histogram]
+    """The latencies per normalized statement"""
+    checkout: Histogram
+    """The time it took to get a connection from the pools"""
+    max_statements: int
+    _pools: Dict[str, Pool]
+    _peaks: Dict[str, Tuple[int, int]]
+    """The highest amount of checked out and overflow connections per pool"""
+
+    OTHER = "<other>"
+    """Statements exceeding ``max_statements`` are grouped under this name"""
+
+    def __init__(
+        self,
+        slow_query_threshold: float = 0.2,
+        slow_query_buffer: int = 100,
+        max_statements: int = 512,
+    ):
+        """
+        Parameters
+        ----------
+        slow_query_threshold: float
+            The amount of seconds after which a query counts as slow.
+        slow_query_buffer: int
+            The amount of slow queries to keep.
+        max_statements: int
+            The maximum amount of distinct statements to keep histograms for.
+        """
+        self.slow_query_threshold = slow_query_threshold
+        self.slow_queries = deque(maxlen=slow_query_buffer)
+        self.statements = {}
+        self.checkout = Histogram()
+        self.max_statements = max_statements
+        self._pools = {}
+        self._peaks = {}
+
+    def instrument(self, engine: AsyncEngine, name: str) -> NoReturn:
+        """
+        Hooks into the pool and the statement-execution of an engine.
+
+        Parameters
+        ----------
+        engine: AsyncEngine
+            The engine to instrument.
+        name: str
+            The name to display the pool with.
+
+        Notes
+        -----
+        Pools recreated by ``engine.dispose`` get instrumented as well.
+        """
+        sync_engine = engine.sync_engine
+        self._peaks[name] = 0, 0
+        self._instrument_pool(sync_engine.pool, name)
+
+        event.listen(sync_engine, "before_cursor_execute", self._before_execute)
+        event.listen(sync_engine, "after_cursor_execute", self._after_execute)
+        event.listen(sync_engine, "handle_error", self._handle_error)
+
+    def _instrument_pool(self, pool: Pool, name: str) -> NoReturn:
+        self._pools[name] = pool
+
+        # there's no event before a checkout, so the wait is measured around it
+        connect = pool.connect
+
+        def timed_connect():
+            start = perf_counter()
+            try:
+                return connect()
+            finally:
+                self.checkout.add(perf_counter() - start)
+                self._record_peaks(name, pool)
+
+        # ``engine.dispose`` replaces the pool with a recreated one
+        recreate = pool.recreate
+
+        def instrumented_recreate():
+            new = recreate()
+            self._instrument_pool(new, name)
+            return new
+
+        pool.connect = timed_connect
+        pool.recreate = instrumented_recreate
+
+    def _record_peaks(self, name: str, pool: Pool) -> NoReturn:
+        _, checked_out, overflow = _pool_state(pool)
+        peak_checked_out, peak_overflow = self._peaks[name]
+        self._peaks[name] = (
+            max(peak_checked_out, checked_out),
+            max(peak_overflow, overflow),
+        )
+
+    @staticmethod
+    def _before_execute(conn: Connection, *_) -> NoReturn:
+        conn.info.setdefault("query_start", []).append(perf_counter())
+
+    def _after_execute(self, conn: Connection, _, statement: str, *__) -> NoReturn:
+        self.record(statement, perf_counter() - conn.info["query_start"].pop())
+
+    @staticmethod
+    def _handle_error(context: ExceptionContext) -> NoReturn:
+        # ``after_cursor_execute`` isn't called for failed statements
+        if (conn := context.connection) is not None and conn.info.get("query_start"):
+            conn.info["query_start"].pop()
+
+    def record(self, statement: str, latency: float) -> NoReturn:
+        """
+        Records the latency of an executed statement.
+
+        Parameters
+        ----------
+        statement: str
+            The executed statement.
+        latency: float
+            The latency in seconds.
+        """
+        statement = normalize_sql(statement)
+        if (histogram := self.statements.get(statement)) is None:
+            if len(self.statements) >= self.max_statements:
+                statement = DBMetrics.OTHER
+                histogram = self.statements.setdefault(statement, Histogram())
+            else:
+                histogram = self.statements[statement] = Histogram()
+        histogram.add(latency)
+
+        if latency >= self.slow_query_threshold:
+            self.slow_queries.append(
+                SlowQuery(time(), latency, statement, current_command.get())
+            )
+
+    def pools(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns the current state and the peaks of every instrumented pool.
+        """
+        out = {}
+        for name, pool in self._pools.items():
+            size, checked_out, overflow = _pool_state(pool)
+            peak_checked_out, peak_overflow = self._peaks[name]
+            out[name] = {
+                "size": size,
+                "checked_out": checked_out,
+                "overflow": overflow,
+                "peak_checked_out": peak_checked_out,
+                "peak_overflow": peak_overflow,
+            }
+        return out
+
+
+def _pool_state(pool: Pool) -> Tuple[int, int, int]:
+    """
+    Returns the size, the checked out and the overflow connections of a pool.
+    """
+    if not isinstance(pool, QueuePool):
+        return 0, 0, 0
+    # the overflow is negative as long as the pool isn't filled
+    return pool.size(), pool.checkedout(), max(pool.overflow(), 0)
@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+
+__all__ = (
+    "LanguageModel",
+    "resolve_language",
+)
+
+
+from sqlalchemy import Column, BigInteger, Boolean, String
+from typing import TYPE_CHECKING
+
+from AlbertUnruhUtils.utils.logger import get_logger
+
+from .cache import LocalCache
+from .config import Config
+from .database import Base, db, redis_publish, redis_subscribe
+from .environment import LOCAL_CACHE_TTL
+
+
+if TYPE_CHECKING:
+    from naff import Snowflake_Type
+    from typing import NoReturn, Optional, Tuple
+
+
+logger = get_logger(__name__.split(".")[-1], level=None, add_handler=False)
+
+
+class LanguageModel(Base):
+    __tablename__ = "language"
+
+    id: Column | int = Column(BigInteger, primary_key=True, nullable=False)
+    user: Column | bool = Column(Boolean, primary_key=True, nullable=False)
+    """Whether ``id`` is a user (otherwise it's a guild)"""
+    language: Column | str = Column(String(8), nullable=False)
+
+    CACHE: LocalCache[Tuple[int, bool], Optional[str]] = LocalCache(
+        LOCAL_CACHE_TTL, max_size=8192
+    )
+    """The languages (``None`` if there's no preference)"""
+
+    CHANNEL = "language"
+
+    @staticmethod
+    async def get(id: Snowflake_Type, user: bool) -> Optional[str]:  # noqa
+        """
+        Returns the preferred language of a guild or user.
+
+        Parameters
+        ----------
+        id: Snowflake_Type
+            The id of the guild or user.
+        user: bool
+            Whether ``id`` is a user.
+
+        Returns
+        -------
+        str, optional
+            ``None`` if there's no preference.
+        """
+        key = int(id), user
+        if (language := LanguageModel.CACHE.get(key)) is not LocalCache.MISSING:
+            return language
+
+        row = await db.get(LanguageModel, id=key[0], user=user)
+        language = LanguageModel.CACHE[key] = None if row is None else row.language
+        return language
+
+    @staticmethod
+    async def set(
+        id: Snowflake_Type, user: bool, language: Optional[str]  # noqa
+    ) -> NoReturn:
+        """
+        Sets (or removes if ``None``) the preferred language of a guild or user.
+
+        Parameters
+        ----------
+        id: Snowflake_Type
+            The id of the guild or user.
+        user: bool
+            Whether ``id`` is a user.
+        language: str, optional
+            The language.
+        """
+        assert language is None or language in Config.LANGUAGE_AVAILABLE, (
+            f"Unsupported language {language!r}! "
+            f"Supported languages are: {', '.join(Config.LANGUAGE_AVAILABLE)}"
+        )
+
+        key = int(id), user
+        row = await db.get(LanguageModel, id=key[0], user=user)
+        if language is None:
+            if row is not None:
+                await db.delete(row)
+        elif row is None:
+            await db.add(LanguageModel(id=key[0], user=user, language=language))
+        else:
+            row.language = language
+
+        # reads of this transaction load the new language from the database,
+        # before the commit other processes would reload and keep the old one
+        await db.session.flush()
+        LanguageModel.CACHE.pop(key)
+
+        async def publish():
+            LanguageModel.CACHE[key] = language
+            await redis_publish(LanguageModel.CHANNEL, f"{int(user)}:{key[0]}")
+
+        await db.after_commit(publish)
+        logger.debug(
+            f"Set language of {'user' if user else 'guild'} {id} to {language}"
+        )
+
+    @staticmethod
+    def on_message(message: str) -> NoReturn:
+        """
+        Drops a changed language of another process.
+        """
+        user, _, id = message.partition(":")  # noqa
+        LanguageModel.CACHE.pop((int(id), bool(int(user))))
+
+
+redis_subscribe(LanguageModel.CHANNEL, LanguageModel.on_message)
+
+
+async def resolve_language(
+    *,
+    guild: Optional[Snowflake_Type] = None,
+    user: Optional[Snowflake_Type] = None,
+) -> Optional[str]:
+    """
+    Resolves the language to use for a user within a guild.
+
+    Parameters
+    ----------
+    guild: Snowflake_Type, optional
+        The guild (``None`` for DMs).
+    user: Snowflake_Type, optional
+        The user.
+
+    Returns
+    -------
+    str, optional
+        The language of the user, otherwise the one of the guild
+        (``None`` if neither has a preference).
+    """
+    if user is not None and (language := await LanguageModel.get(user, True)):
+        return language
+    if guild is not None:
+        return await LanguageModel.get(guild, False)
+    return None
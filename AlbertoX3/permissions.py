@@ -5,9 +5,20 @@ __all__ = ("PermissionsModel",)
 
 
 from sqlalchemy import Column, String, Integer
+from typing import TYPE_CHECKING
 
-from .database import Base, db, redis
-from .environment import CACHE_TTL
+from AlbertUnruhUtils.utils.logger import get_logger
+
+from .cache import LocalCache
+from .database import Base, db, redis, redis_publish, redis_subscribe, select
+from .environment import CACHE_TTL, LOCAL_CACHE_TTL, REDIS_PUBSUB
+
+
+if TYPE_CHECKING:
+    from typing import Dict, List, NoReturn
+
+
+logger = get_logger(__name__.split(".")[-1], level=None, add_handler=False)
 
 
 class PermissionsModel(Base):
@@ -18,29 +29,135 @@ class PermissionsModel(Base):
     )
     level: Column | int = Column(Integer, nullable=False)
 
+    # changes get published, without that only a short TTL keeps processes in sync
+    CACHE: LocalCache[str, int] = LocalCache(
+        CACHE_TTL if REDIS_PUBSUB else LOCAL_CACHE_TTL
+    )
+    """The levels (filled by ``load``, ``get_many`` and ``set``)"""
+
+    CHANNEL = "permissions"
+    R_VERSION = "permissions::version"
+
+    _versions: Dict[str, int] = {}
+    """The version of the last applied change per permission"""
+
     @staticmethod
     async def create(permission: str, level: int) -> PermissionsModel:
         return await db.add(PermissionsModel(permission=permission, level=level))
 
     @staticmethod
-    async def get(permission: str, default: int) -> int:
-        if await redis.exists(r_key := f"permissions::{permission}"):
-            return int(await redis.get(r_key))
+    async def load() -> NoReturn:
+        """
+        Loads the whole ``permissions``-table into ``CACHE`` and Redis.
+        """
+        rows: List[PermissionsModel] = await db.all(select(PermissionsModel))
 
-        if (row := await db.get(PermissionsModel, permission=permission)) is None:
-            row = await PermissionsModel.create(permission, default)
+        async with redis.pipeline(transaction=False) as pipe:
+            for row in rows:
+                pipe.setex(f"permissions::{row.permission}", CACHE_TTL, row.level)
+                PermissionsModel.CACHE[row.permission] = row.level
+            await pipe.execute()
 
-        await redis.setex(r_key, CACHE_TTL, row.level)
+        logger.info(f"Loaded {len(rows)} permissions")
 
-        return row.level
+    @staticmethod
+    async def get(permission: str, default: int) -> int:
+        if (level := PermissionsModel.CACHE.get(permission)) is not LocalCache.MISSING:
+            return level
+
+        return (await PermissionsModel.get_many({permission: default}))[permission]
 
     @staticmethod
-    async def set(permission: str, level: int) -> PermissionsModel:
-        await redis.setex(f"permissions::{permission}", CACHE_TTL, level)
+    async def get_many(permissions: Dict[str, int]) -> Dict[str, int]:
+        """
+        Returns the levels of many permissions at once.
+
+        Parameters
+        ----------
+        permissions: Dict[str, int]
+            The permissions with their default level.
+
+        Returns
+        -------
+        Dict[str, int]
+
+        Notes
+        -----
+        Uses at most one ``MGET``, one ``SELECT`` and one pipelined ``SETEX``-batch.
+        """
+        levels: Dict[str, int] = {}
+        missing: List[str] = []
+
+        for permission in permissions:
+            level = PermissionsModel.CACHE.get(permission)
+            if level is LocalCache.MISSING:
+                missing.append(permission)
+            else:
+                levels[permission] = level
+
+        if missing:
+            r_keys = [f"permissions::{permission}" for permission in missing]
+            for permission, level in zip(missing, await redis.mget(r_keys)):
+                if level is not None:
+                    levels[permission] = int(level)
+                    PermissionsModel.CACHE[permission] = int(level)
+            missing = [permission for permission in missing if permission not in levels]
+
+        if missing:
+            rows = {
+                row.permission: row
+                for row in await db.all(
+                    select(PermissionsModel).where(
+                        PermissionsModel.permission.in_(missing)
+                    )
+                )
+            }
+            async with redis.pipeline(transaction=False) as pipe:
+                for permission in missing:
+                    if (row := rows.get(permission)) is None:
+                        row = await PermissionsModel.create(
+                            permission, permissions[permission]
+                        )
+                    pipe.setex(f"permissions::{permission}", CACHE_TTL, row.level)
+                    levels[permission] = PermissionsModel.CACHE[permission] = row.level
+                await pipe.execute()
+
+        return {permission: levels[permission] for permission in permissions}
 
+    @staticmethod
+    async def set(permission: str, level: int) -> PermissionsModel:
         if (row := await db.get(PermissionsModel, permission=permission)) is None:
             row = await PermissionsModel.create(permission, level)
 
         row.level = level
 
+        # before the commit other processes would reload and keep the old level
+        async def publish():
+            async with redis.pipeline(transaction=False) as pipe:
+                pipe.incr(PermissionsModel.R_VERSION)
+                pipe.setex(f"permissions::{permission}", CACHE_TTL, level)
+                version, _ = await pipe.execute()
+
+            PermissionsModel._apply(version, permission, level)
+            await redis_publish(
+                PermissionsModel.CHANNEL, f"{version}:{permission}:{level}"
+            )
+
+        await db.after_commit(publish)
         return row
+
+    @staticmethod
+    def _apply(version: int, permission: str, level: int) -> NoReturn:
+        # changes may arrive out of order, so only newer ones are applied
+        if version > PermissionsModel._versions.get(permission, 0):
+            PermissionsModel._versions[permission] = version
+            PermissionsModel.CACHE[permission] = level
+
+    @staticmethod
+    def on_message(message: str) -> NoReturn:
+        version, message = message.split(":", 1)
+        permission, level = message.rsplit(":", 1)
+        PermissionsModel._apply(int(version), permission, int(level))
+
+
+redis_subscribe(PermissionsModel.CHANNEL, PermissionsModel.on_message)
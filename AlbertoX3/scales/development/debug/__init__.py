@@ -7,6 +7,7 @@ __all__ = (
 )
 
 
+from datetime import datetime
 from typing import TYPE_CHECKING
 
 from dis_snek.ext.debug_scale import DebugScale, debug_embed  # noqa
@@ -18,7 +19,11 @@ from dis_snek import (
 )
 
 from AlbertoX3.adis_snek import Scale
-from AlbertoX3.database import Base, db, select
+from AlbertoX3.database import Base, db
+from AlbertoX3.instrumentation import LATENCY_BUCKETS
+from AlbertoX3.stats import DetailedStatsModel, stats_aggregator
+
+from .paginator import TablePaginator, count_rows
 
 
 if TYPE_CHECKING:
@@ -50,6 +55,16 @@ class Debug(DebugScale, Scale):
                     SlashCommandChoice("schema", "schema"),
                 ],
             ),
+            SlashCommandOption(
+                "count",
+                OptionTypes.STRING,
+                required=False,
+                choices=[
+                    SlashCommandChoice("exact", "exact"),
+                    SlashCommandChoice("estimate", "estimate"),
+                ],
+            ),
+            SlashCommandOption("limit", OptionTypes.INTEGER, required=False),
         ],
         sub_cmd_description="Get information about the database",
     )
@@ -60,8 +75,20 @@ class Debug(DebugScale, Scale):
         for t in Base.__subclasses__():
             if t.__tablename__ == ctx.kwargs["table"]:
                 if ctx.kwargs["option"] == "values":
-                    for r in await db.exec(select(t.__table__)):
-                        res.append(str(r))
+                    header = None
+                    if mode := ctx.kwargs.get("count"):
+                        rows, estimated = await count_rows(
+                            t.__table__, mode == "estimate"
+                        )
+                        rows = f"~{rows}" if estimated else rows
+                        header = f"{t.__tablename__}: {rows} rows"
+                    paginator = await TablePaginator.create_from_table(
+                        self.bot,
+                        t.__table__,
+                        limit=ctx.kwargs.get("limit"),
+                        header=header,
+                    )
+                    return await paginator.send(ctx)
                 elif ctx.kwargs["option"] == "schema":
                     res.append(repr(t.__table__))
                 else:
@@ -77,6 +104,91 @@ class Debug(DebugScale, Scale):
             self.bot, "\n".join(res or ["Empty!"]), "```", "```", 2000, 300
         ).send(ctx)
 
+    @DebugScale.debug_info.subcommand(
+        "stats",
+        options=[
+            SlashCommandOption(
+                "kind",
+                OptionTypes.STRING,
+                choices=[
+                    SlashCommandChoice("commands", "command"),
+                    SlashCommandChoice("events", "event"),
+                ],
+            ),
+            SlashCommandOption("date", OptionTypes.STRING, required=False),
+        ],
+        sub_cmd_description="Get counts and latencies per command/event (YYYY-MM-DD)",
+    )
+    async def stats_info(self, ctx: InteractionContext) -> None:
+        await ctx.defer()
+        await stats_aggregator.flush()
+
+        def fmt(bound):
+            return f">{LATENCY_BUCKETS[-1]}ms" if bound is None else f"<={bound}ms"
+
+        res = []
+        rows = await DetailedStatsModel.get(ctx.kwargs.get("date"), ctx.kwargs["kind"])
+        for r in sorted(rows, key=lambda r: r.count, reverse=True):
+            res.append(
+                f"{r.name}: {r.count}x | avg {r.latency_avg:.2f}ms | "
+                f"p50 {fmt(r.latency_percentile(50))} | "
+                f"p90 {fmt(r.latency_percentile(90))} | "
+                f"p99 {fmt(r.latency_percentile(99))}"
+            )
+
+        await Paginator.create_from_string(
+            self.bot, "\n".join(res or ["Empty!"]), "```", "```", 2000, 300
+        ).send(ctx)
+
+    @DebugScale.debug_info.subcommand(
+        "metrics",
+        sub_cmd_description="Get connection-pool metrics, query latencies and slow queries",
+    )
+    async def metrics_info(self, ctx: InteractionContext) -> None:
+        await ctx.defer()
+        metrics = db.metrics
+
+        def fmt(bound):
+            return f">{LATENCY_BUCKETS[-1]}ms" if bound is None else f"<={bound}ms"
+
+        res = ["Pools:"]
+        for name, pool in metrics.pools().items():
+            res.append(
+                f"{name}: {pool['checked_out']}/{pool['size']} checked out "
+                f"(peak {pool['peak_checked_out']}) | "
+                f"overflow {pool['overflow']} (peak {pool['peak_overflow']})"
+            )
+        res.append(
+            f"checkout: {metrics.checkout.count}x | "
+            f"avg {metrics.checkout.avg:.2f}ms | "
+            f"p99 {fmt(metrics.checkout.percentile(99))}"
+        )
+
+        res.append("")
+        res.append("Statements (by total time):")
+        statements = sorted(
+            metrics.statements.items(), key=lambda s: s[1].total, reverse=True
+        )
+        for statement, histogram in statements:
+            res.append(
+                f"{histogram.count}x | avg {histogram.avg:.2f}ms | "
+                f"p50 {fmt(histogram.percentile(50))} | "
+                f"p99 {fmt(histogram.percentile(99))} | {statement}"
+            )
+
+        res.append("")
+        res.append(f"Slow queries (>={metrics.slow_query_threshold * 1000:g}ms):")
+        for query in reversed(metrics.slow_queries):
+            res.append(
+                f"{datetime.fromtimestamp(query.timestamp):%H:%M:%S} | "
+                f"{query.latency * 1000:.2f}ms | "
+                f"{query.command or '/'} | {query.statement}"
+            )
+
+        await Paginator.create_from_string(
+            self.bot, "\n".join(res), "```", "```", 2000, 300
+        ).send(ctx)
+
 
 def setup(bot: Snake):
     Debug(bot)
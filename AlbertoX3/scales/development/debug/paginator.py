@@ -0,0 +1,184 @@
+from __future__ import annotations
+
+
+__all__ = (
+    "TablePaginator",
+    "count_rows",
+)
+
+
+from sqlalchemy import text, tuple_
+from typing import TYPE_CHECKING
+
+from dis_snek.ext.paginators import Paginator
+from dis_snek import Embed, EmbedFooter
+
+from AlbertoX3.database import db, select
+
+
+if TYPE_CHECKING:
+    from dis_snek import ComponentContext, Snake
+    from sqlalchemy import Table
+    from typing import Any, List, NoReturn, Optional, Tuple
+
+
+ROW_LENGTH = 180
+"""Rows are cut after this amount of characters"""
+
+
+async def count_rows(table: Table, estimate: bool = False) -> Tuple[int, bool]:
+    """
+    Counts the rows of a table.
+
+    Parameters
+    ----------
+    table: Table
+        The table to count the rows of.
+    estimate: bool
+        Whether the estimate of the table-statistics should be used (if supported).
+
+    Returns
+    -------
+    Tuple[int, bool]
+        The amount of rows and whether it's an estimate.
+    """
+    if estimate:
+        match db.engine.dialect.name:
+            case "mysql" | "mariadb":
+                statement = text(
+                    "SELECT TABLE_ROWS FROM information_schema.TABLES "
+                    "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :name"
+                )
+            case "postgresql":
+                statement = text(
+                    "SELECT reltuples::bigint FROM pg_class "
+                    "WHERE oid = to_regclass(:name)"
+                )
+            case _:
+                statement = None
+
+        if statement is not None:
+            async with db.read():
+                rows = await db.first(statement, {"name": table.name})
+            if rows is not None and rows >= 0:
+                return rows, True
+
+    async with db.read():
+        return await db.count(table), False
+
+
+class TablePaginator(Paginator):
+    """
+    A paginator which only fetches the displayed rows of a table.
+
+    Notes
+    -----
+    The rows are ordered by the primary key and fetched using keyset-pagination,
+    therefore only the ``first``-, ``back``- and ``next``-buttons are available.
+    """
+
+    table: Table
+    rows: int
+    limit: Optional[int]
+    header: Optional[str]
+    _keys: List[Optional[Tuple[Any, ...]]]
+    """The primary key of the last row before every known page"""
+
+    @classmethod
+    async def create_from_table(
+        cls,
+        client: Snake,
+        table: Table,
+        rows: int = 20,
+        limit: Optional[int] = None,
+        header: Optional[str] = None,
+        timeout: int = 0,
+    ) -> TablePaginator:
+        """
+        Creates a paginator and fetches the first page.
+
+        Parameters
+        ----------
+        client: Snake
+            The bot.
+        table: Table
+            The table to display.
+        rows: int
+            The amount of rows per page.
+        limit: int, optional
+            The maximum amount of rows to display.
+        header: str, optional
+            Gets displayed as title of every page.
+        timeout: int
+            The amount of seconds until the paginator disables itself.
+        """
+        self = cls(
+            client,
+            timeout_interval=timeout,
+            show_last_button=False,
+            show_select_menu=False,
+        )
+        self.table = table
+        self.rows = rows
+        self.limit = limit
+        self.header = header
+        self._keys = [None]
+        await self._load(0)
+        return self
+
+    async def _load(self, index: int) -> NoReturn:
+        rows = self.rows
+        more = True
+        if self.limit is not None:
+            rows = max(min(rows, self.limit - index * self.rows), 0)
+            more = (index + 1) * self.rows < self.limit
+
+        keys = list(self.table.primary_key.columns)
+        # one more row to know whether there's a next page
+        statement = select(self.table).order_by(*keys).limit(rows + 1 if more else rows)
+        if (after := self._keys[index]) is not None:
+            statement = statement.where(tuple_(*keys) > after)
+
+        lines = []
+        last = None
+        async with db.read():
+            async for row in await db.stream(statement, scalars=False):
+                if len(lines) == rows:
+                    if len(self._keys) == index + 1:
+                        self._keys.append(tuple(last[key] for key in keys))
+                    break
+                line = str(tuple(row))
+                if len(line) > ROW_LENGTH:
+                    line = line[: ROW_LENGTH - 1] + "…"
+                lines.append(line)
+                last = row._mapping
+
+        content = "\n".join(lines or ["Empty!"]).replace("`", "`\u200B")
+        page = f"{index + 1}"
+        if len(self._keys) == index + 1:
+            page += f"/{index + 1}"
+
+        # only the displayed page is held in memory
+        self.pages = [None] * len(self._keys)
+        self.pages[index] = Embed(
+            title=self.header,
+            description=f"```\n{content}\n```",
+            footer=EmbedFooter(text=f"Page {page}"),
+        )
+
+    async def _on_button(self, ctx: ComponentContext, *args, **kwargs) -> Any:
+        if ctx.author.id == self.author_id:
+            match ctx.custom_id.split("|")[1]:
+                case "first":
+                    index = 0
+                case "back":
+                    index = self.page_index - 1
+                case "next":
+                    index = self.page_index + 1
+                case _:
+                    index = self.page_index
+
+            if 0 <= index < len(self._keys):
+                await self._load(index)
+
+        return await super()._on_button(ctx, *args, **kwargs)
@@ -7,8 +7,8 @@ __all__ = (
 )
 
 
+from functools import partial
 from pathlib import Path
-from yaml import safe_load
 from typing import TYPE_CHECKING
 
 from dis_snek import (
@@ -19,9 +19,10 @@ from dis_snek import (
 )
 
 from AlbertoX3.adis_snek import Scale
-from AlbertoX3.aio import event_loop
-from AlbertoX3.database import db_wrapper
+from AlbertoX3.database import db
+from AlbertoX3.startup import startup
 from AlbertoX3.translations import t
+from AlbertoX3.utils import load_yaml
 from AlbertoX3.scales.social.money import (
     Colors as mColors,  # noqa (because of __all__)
     MoneyModel,  # noqa (because of __all__)
@@ -47,7 +48,13 @@ class Inventory(Scale):
     async def item(self, ctx: MessageContext):
         item = ctx.args[0] if ctx.args else None
         assert item in t.items, t.item.not_found(item=item)
-        item = await ItemModel.get(int(item))
+        async with db.read():
+            item = await ItemModel.get(int(item))
+            claimed = (
+                await item.get_claimed_amount()
+                if item.max_available is not None
+                else None
+            )
 
         t_item = getattr(t.items, str(item.id))
         name = t_item.name
@@ -56,11 +63,7 @@ class Inventory(Scale):
         info = [t.item.description(description=description)]
         if item.max_available is not None:
             info.append(t.item.quantity(cnt=item.max_available))
-            info.append(
-                t.item.in_the_market(
-                    cnt=item.max_available - await item.get_claimed_amount()
-                )
-            )
+            info.append(t.item.in_the_market(cnt=item.max_available - claimed))
         info = "\n\n".join(info)
 
         embed = Embed(
@@ -79,7 +82,8 @@ class Inventory(Scale):
 
     @message_command("inventory")
     async def inventory(self, ctx: MessageContext):
-        inventory = await InventoryModel.get(ctx.author.id)
+        async with db.read():
+            inventory = await InventoryModel.get(ctx.author.id)
         embed = Embed(
             description=t.inventory,
             timestamp=Timestamp.now(),
@@ -124,13 +128,15 @@ class Inventory(Scale):
             emoji_r=emoji,
             emoji_a=await get_emoji(payer.amount, g),
         )
+        claimed = 0
         if item.max_available is not None:
-            assert (
-                await item.get_claimed_amount() < item.max_available
-            ), t.item.not_available(item=item.id)
+            claimed = await item.get_claimed_amount()
+            assert claimed < item.max_available, t.item.not_available(item=item.id)
 
         await MoneyModel.update(payer.user, -item.price, True)
         await InventoryModel.update(payer.user, item.id, 1, True)
+        # the cached amount only gets invalidated once the purchase is committed
+        claimed += 1
 
         embed = Embed(
             description=t.bought(price=item.price, emoji=emoji, item=item.id),
@@ -147,11 +153,7 @@ class Inventory(Scale):
         info = [t.item.description(description=description)]
         if item.max_available is not None:
             info.append(t.item.quantity(cnt=item.max_available))
-            info.append(
-                t.item.in_the_market(
-                    cnt=item.max_available - await item.get_claimed_amount()
-                )
-            )
+            info.append(t.item.in_the_market(cnt=item.max_available - claimed))
         info = "\n\n".join(info)
 
         embed.add_field(t_item.name, info)
@@ -161,16 +163,20 @@ class Inventory(Scale):
         )
 
 
-@db_wrapper
 async def create_all_items(items):
-    await __import__("asyncio").sleep(2)  # all tables should be created
-    for id in items:  # noqa
-        if await ItemModel.get(id) is None:
-            await ItemModel.add(id, **items[id])
+    # updates the stored items as well, so changes of items.yml get applied
+    defaults = {"buyable": False, "price": None, "max_available": None}
+    await db.bulk_upsert(
+        ItemModel,
+        [{"id": id, **defaults, **item} for id, item in items.items()],  # noqa
+    )
 
 
 def setup(bot: Snake):
     Inventory(bot)
-    event_loop.create_task(
-        create_all_items(safe_load((Path(__file__).parent / "items.yml").read_text()))
+    startup.register(
+        partial(
+            create_all_items,
+            load_yaml(Path(__file__).parent / "items.yml"),
+        )
     )
@@ -1,23 +1,28 @@
 from __future__ import annotations
 
 
-from sqlalchemy import Column, Integer, BigInteger, Boolean
+from functools import partial
+from sqlalchemy import Column, Integer, BigInteger, Boolean, Index, UniqueConstraint
+from sqlalchemy.future import select as sa_select
+from sqlalchemy.sql.functions import sum as sa_sum
 from typing import TYPE_CHECKING, overload
 
-from AlbertoX3.database import Base, db, filter_by
+from AlbertoX3.database import Base, db, filter_by, redis
+from AlbertoX3.environment import CACHE_TTL
 
 
 if TYPE_CHECKING:
-    from typing import Optional, List
+    from typing import Optional, List, Dict
 
 
 class ItemModel(Base):
     __tablename__ = "item"
+    __reference__ = True
 
     id: Column | int = Column(
         Integer, primary_key=True, unique=True, autoincrement=False, nullable=False
     )
-    buyable: Column | bool = Column(Boolean, nullable=False)
+    buyable: Column | bool = Column(Boolean, nullable=False, default=False)
     price: Column | int = Column(Integer, nullable=True)
     max_available: Column | Optional[int] = Column(Integer, nullable=True)
 
@@ -44,16 +49,53 @@ class ItemModel(Base):
         return await db.get(ItemModel, id=id)
 
     async def get_claimed_amount(self) -> int:
-        return sum(
-            map(
-                lambda i: i.quantity,
-                await db.all(filter_by(InventoryModel, item=self.id)),
+        return (await ItemModel.get_claimed_amounts(self.id))[self.id]
+
+    @staticmethod
+    async def get_claimed_amounts(*items: int) -> Dict[int, int]:
+        """
+        Returns the claimed quantity of every given item.
+
+        Notes
+        -----
+        Uncached items are summed up within one query.
+        """
+        claimed: Dict[int, int] = {}
+        if not items:
+            return claimed
+
+        missing = []
+        keys = [f"inventory::claimed::{item}" for item in items]
+        for item, value in zip(items, await redis.mget(keys)):
+            if value is None:
+                missing.append(item)
+            else:
+                claimed[item] = int(value)
+
+        if missing:
+            rows = await db.exec(
+                sa_select(InventoryModel.item, sa_sum(InventoryModel.quantity))
+                .where(InventoryModel.item.in_(missing))
+                .group_by(InventoryModel.item)
             )
-        )
+            summed = {item: int(quantity) for item, quantity in rows}
+
+            async with redis.pipeline(transaction=False) as pipe:
+                for item in missing:
+                    claimed[item] = summed.get(item, 0)
+                    pipe.setex(f"inventory::claimed::{item}", CACHE_TTL, claimed[item])
+                await pipe.execute()
+
+        return claimed
 
 
 class InventoryModel(Base):
     __tablename__ = "inventory"
+    __table_args__ = (
+        UniqueConstraint("user", "item", name="inventory_user_item"),
+        Index("inventory_item_quantity", "item", "quantity"),
+        Base.__table_args__,
+    )
 
     id: Column | int = Column(
         Integer, primary_key=True, unique=True, autoincrement=True, nullable=False
@@ -68,12 +110,18 @@ class InventoryModel(Base):
         item: int,
         quantity: int,
         relative: bool = False,
-    ) -> InventoryModel:
-        inv = await InventoryModel.get(user, item)
-        if relative:
-            quantity = inv.quantity + quantity
-        inv.quantity = quantity
-        return inv
+    ) -> int:
+        new = (
+            await db.upsert_increment(
+                InventoryModel,
+                {"user": user, "item": item},
+                {"quantity": quantity},
+                relative=relative,
+            )
+        ).quantity
+        # concurrent reads would cache the old amount again before the commit
+        await db.after_commit(partial(redis.delete, f"inventory::claimed::{item}"))
+        return new
 
     @staticmethod
     @overload
@@ -10,6 +10,8 @@ __all__ = (
 from typing import TYPE_CHECKING
 
 from dis_snek import (
+    check,
+    is_owner,
     message_command,
     Embed,
     EmbedFooter,
@@ -17,12 +19,13 @@ from dis_snek import (
 )
 
 from AlbertoX3.adis_snek import Scale
-from AlbertoX3.database import db, filter_by
+from AlbertoX3.database import db
+from AlbertoX3.startup import startup
 from AlbertoX3.translations import t
 from AlbertoX3.utils import get_user
 
 from .colors import Colors
-from .models import MoneyModel
+from .models import MoneyModel, GlobalMoneyModel
 
 
 if TYPE_CHECKING:
@@ -34,11 +37,12 @@ t = t.money
 
 
 async def get_global_money() -> int:
-    return sum(map(lambda m: m.amount, await db.all(filter_by(MoneyModel))))
+    return await GlobalMoneyModel.get()
 
 
 async def get_emoji(amount: int, global_amount: int | None = None) -> str:
-    global_amount = global_amount or await get_global_money()
+    if global_amount is None:
+        global_amount = await get_global_money()
     if global_amount / 1 <= amount:
         return "\uD83D\uDCB0"  # :moneybag:
     if global_amount / 2 <= amount:
@@ -53,8 +57,9 @@ async def get_emoji(amount: int, global_amount: int | None = None) -> str:
 class Money(Scale):
     @message_command("money")
     async def money(self, ctx: MessageContext):
-        amount = (await MoneyModel.get(ctx.author.id)).amount
-        amount_g = await get_global_money()
+        async with db.read():
+            amount = (await MoneyModel.get(ctx.author.id)).amount
+            amount_g = await get_global_money()
 
         embed = Embed(
             timestamp=Timestamp.now(),
@@ -113,6 +118,27 @@ class Money(Scale):
             ),
         )
 
+    @message_command("money_rebuild")
+    @check(is_owner())
+    async def money_rebuild(self, ctx: MessageContext):
+        amount_g = await GlobalMoneyModel.rebuild()
+
+        await ctx.reply(
+            embed=Embed(
+                description=t.all.rebuilt(
+                    cnt=amount_g, emoji=await get_emoji(amount_g, amount_g)
+                ),
+                timestamp=Timestamp.now(),
+                footer=EmbedFooter(
+                    text=tg.executed_by(user=ctx.author, id=ctx.author.id),
+                    icon_url=ctx.author.display_avatar.url,
+                ),
+                color=Colors.money,
+            ),
+        )
+
 
 def setup(bot: Snake):
     Money(bot)
+    # creates the global amount and corrects differences lost by a restart
+    startup.register(GlobalMoneyModel.rebuild)
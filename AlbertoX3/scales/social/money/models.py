@@ -1,9 +1,22 @@
 from __future__ import annotations
 
 
+from functools import partial
 from sqlalchemy import Column, Integer, BigInteger
+from sqlalchemy.sql.functions import coalesce, sum as sa_sum
+from typing import TYPE_CHECKING
 
-from AlbertoX3.database import Base, db
+from AlbertUnruhUtils.utils.logger import get_logger
+
+from AlbertoX3.database import Base, db, db_context, filter_by, redis, select, update
+from AlbertoX3.environment import CACHE_TTL
+
+
+if TYPE_CHECKING:
+    from typing import NoReturn
+
+
+logger = get_logger(__name__.split(".")[-1], level=None, add_handler=False)
 
 
 class MoneyModel(Base):
@@ -20,12 +33,23 @@ class MoneyModel(Base):
         user: int,
         amount: int,
         relative: bool = False,
-    ) -> MoneyModel:
-        inv = await MoneyModel.get(user)
-        if relative:
-            amount = inv.amount + amount
-        inv.amount = amount
-        return inv
+    ) -> int:
+        if not relative:
+            # the global amount is maintained with differences only
+            # the identity map may hold an outdated amount
+            row = await db.first(
+                filter_by(MoneyModel, user=user)
+                .with_for_update()
+                .execution_options(populate_existing=True)
+            )
+            amount -= row.amount if row is not None else 0
+
+        new = (
+            await db.upsert_increment(MoneyModel, {"user": user}, {"amount": amount})
+        ).amount
+        # the single global row would otherwise stay locked until the commit
+        await db.after_commit(partial(GlobalMoneyModel.incr, amount))
+        return new
 
     @staticmethod
     async def get(
@@ -34,3 +58,76 @@ class MoneyModel(Base):
         return await db.get(MoneyModel, user=user) or await db.add(
             MoneyModel(user=user, amount=0)
         )
+
+
+class GlobalMoneyModel(Base):
+    """
+    The sum of every ``MoneyModel.amount``.
+
+    Notes
+    -----
+    Gets created by ``rebuild`` on startup and afterwards maintained by
+    ``MoneyModel.update``, which adds its differences once they are committed.
+    """
+
+    __tablename__ = "money_global"
+
+    id: Column | int = Column(
+        Integer, primary_key=True, unique=True, autoincrement=False, nullable=False
+    )
+    amount: Column | int = Column(BigInteger, nullable=False)
+
+    R_KEY = "money::global"
+    ID = 0
+
+    @staticmethod
+    async def incr(amount: int) -> NoReturn:
+        """
+        Adds ``amount`` within a separate (short) transaction.
+        """
+        async with db_context(new=True):
+            result = await db.exec(
+                update(GlobalMoneyModel)
+                .where(GlobalMoneyModel.id == GlobalMoneyModel.ID)
+                .values(amount=GlobalMoneyModel.amount + amount)
+            )
+        if not result.rowcount:
+            logger.warning("The global amount is missing, rebuilding it")
+            # the sum already includes the committed change
+            await GlobalMoneyModel.rebuild()
+        else:
+            await redis.delete(GlobalMoneyModel.R_KEY)
+
+    @staticmethod
+    async def rebuild() -> int:
+        """
+        Re-derives the global amount from every committed ``MoneyModel``.
+
+        Notes
+        -----
+        Uses a separate transaction on the primary (even within ``db.read``).
+        """
+        async with db_context(new=True):
+            amount = await db.first(select(coalesce(sa_sum(MoneyModel.amount), 0)))
+            await db.upsert_increment(
+                GlobalMoneyModel,
+                {"id": GlobalMoneyModel.ID},
+                {"amount": amount},
+                relative=False,
+                returning=False,
+            )
+        await redis.delete(GlobalMoneyModel.R_KEY)
+        return amount
+
+    @staticmethod
+    async def get() -> int:
+        if (amount := await redis.get(GlobalMoneyModel.R_KEY)) is not None:
+            return int(amount)
+
+        if (row := await db.get(GlobalMoneyModel, id=GlobalMoneyModel.ID)) is None:
+            amount = await GlobalMoneyModel.rebuild()
+        else:
+            amount = row.amount
+
+        await redis.setex(GlobalMoneyModel.R_KEY, CACHE_TTL, amount)
+        return amount
@@ -1,20 +1,25 @@
 from __future__ import annotations
 
 
-__all__ = ("Settings",)
+__all__ = (
+    "Settings",
+    "prefetch_settings",
+)
 
 
 from sqlalchemy import Column, String
 from typing import TYPE_CHECKING, TypeVar, Type
 
-from .aio import LockDeco
-from .database import Base, db, redis
+from .aio import SingleFlight
+from .cache import LocalCache
+from .database import Base, db, redis, redis_publish, redis_subscribe, select
 from .enum import NoAliasEnum
-from .environment import CACHE_TTL
+from .environment import CACHE_TTL, LOCAL_CACHE_TTL
+from .utils import get_subclasses_in_scales
 
 
 if TYPE_CHECKING:
-    from typing import Optional
+    from typing import Dict, List, Optional, NoReturn, Tuple
 
 
 T = TypeVar("T")
@@ -28,6 +33,13 @@ class SettingsModel(Base):
     )
     value: Column | str = Column(String(256), nullable=False)
 
+    CACHE: LocalCache[str, Optional[str]] = LocalCache(LOCAL_CACHE_TTL)
+    """The raw values (``None`` if there's no such setting)"""
+
+    CHANNEL = "settings"
+
+    _single_flight = SingleFlight()
+
     @staticmethod
     async def _create(key: str, value: str | int | float | bool) -> SettingsModel:
         if isinstance(value, bool):
@@ -36,17 +48,26 @@ class SettingsModel(Base):
         return await db.add(SettingsModel(key=key, value=str(value)))
 
     @staticmethod
-    @LockDeco
-    async def get(dtype: Type[T], key: str, default: Optional[T] = None) -> Optional[T]:
-        if await redis.exists(r_key := f"settings::{key}"):
-            out = await redis.get(r_key)
-        else:
-            if (row := await db.get(SettingsModel, key=key)) is None:
-                if default is None:
-                    return None
-                row = await SettingsModel._create(key, default)
-            out = row.value
-            await redis.setex(r_key, CACHE_TTL, out)
+    async def _load(key: str, default: Optional[T] = None) -> Optional[str]:
+        r_key = f"settings::{key}"
+        # Redis still holds the committed value of settings changed in this context
+        written = db.is_written((SettingsModel.CHANNEL, key))
+        if not written and (out := await redis.get(r_key)) is not None:
+            return out.decode()
+
+        if (row := await db.get(SettingsModel, key=key)) is None:
+            if default is None:
+                return None
+            row = await SettingsModel._create(key, default)
+
+        if not written:
+            await redis.setex(r_key, CACHE_TTL, row.value)
+        return row.value
+
+    @staticmethod
+    def _convert(dtype: Type[T], out: Optional[str]) -> Optional[T]:
+        if out is None:
+            return None
 
         if dtype == bool:
             out = int(out)
@@ -54,22 +75,111 @@ class SettingsModel(Base):
         return dtype(out)
 
     @staticmethod
-    @LockDeco
+    async def get(dtype: Type[T], key: str, default: Optional[T] = None) -> Optional[T]:
+        if db.is_written((SettingsModel.CHANNEL, key)):
+            # uncommitted values are neither cached nor shared with other tasks
+            return SettingsModel._convert(
+                dtype, await SettingsModel._load(key, default)
+            )
+
+        out = SettingsModel.CACHE.get(key)
+        if out is LocalCache.MISSING or (out is None and default is not None):
+            out = await SettingsModel._single_flight.do(
+                (key, default), SettingsModel._load, key, default
+            )
+            SettingsModel.CACHE[key] = out
+
+        return SettingsModel._convert(dtype, out)
+
+    @staticmethod
+    async def get_many(
+        keys: Dict[str, Tuple[Type[T], Optional[T]]]
+    ) -> Dict[str, Optional[T]]:
+        """
+        Returns many settings at once.
+
+        Parameters
+        ----------
+        keys: Dict[str, Tuple[Type[T], Optional[T]]]
+            The keys with their dtype and default.
+
+        Returns
+        -------
+        Dict[str, Optional[T]]
+
+        Notes
+        -----
+        Uses at most one ``MGET``, one ``SELECT`` and one pipelined ``SETEX``-batch.
+        """
+        raw: Dict[str, Optional[str]] = {}
+        missing: List[str] = []
+
+        for key, (_, default) in keys.items():
+            if db.is_written((SettingsModel.CHANNEL, key)):
+                raw[key] = await SettingsModel._load(key, default)
+                continue
+
+            out = SettingsModel.CACHE.get(key)
+            if out is LocalCache.MISSING or (out is None and default is not None):
+                missing.append(key)
+            else:
+                raw[key] = out
+
+        if missing:
+            r_keys = [f"settings::{key}" for key in missing]
+            for key, out in zip(missing, await redis.mget(r_keys)):
+                if out is not None:
+                    raw[key] = SettingsModel.CACHE[key] = out.decode()
+            missing = [key for key in missing if key not in raw]
+
+        if missing:
+            rows = {
+                row.key: row
+                for row in await db.all(
+                    select(SettingsModel).where(SettingsModel.key.in_(missing))
+                )
+            }
+            async with redis.pipeline(transaction=False) as pipe:
+                for key in missing:
+                    if (row := rows.get(key)) is None:
+                        if (default := keys[key][1]) is None:
+                            raw[key] = SettingsModel.CACHE[key] = None
+                            continue
+                        row = await SettingsModel._create(key, default)
+                    pipe.setex(f"settings::{key}", CACHE_TTL, row.value)
+                    raw[key] = SettingsModel.CACHE[key] = row.value
+                await pipe.execute()
+
+        return {key: SettingsModel._convert(keys[key][0], raw[key]) for key in keys}
+
+    @staticmethod
     async def set(dtype: Type[T], key: str, value: T) -> SettingsModel:
-        r_key = f"settings::{key}"
+        if dtype == bool:
+            value = int(value)
+
         if (row := await db.get(SettingsModel, key=key)) is None:
             row = await SettingsModel._create(key, value)
-            await redis.setex(r_key, CACHE_TTL, row.value)
-            return row
+        else:
+            row.value = str(value)
 
-        if dtype == bool:
-            value = int(value)
+        SettingsModel.CACHE.pop(key)
+        db.mark_written((SettingsModel.CHANNEL, key))
+
+        # before the commit other processes would reload and keep the old value
+        async def publish(new: str = row.value):
+            await redis.setex(f"settings::{key}", CACHE_TTL, new)
+            # concurrent reads may have cached the old value again meanwhile
+            SettingsModel.CACHE.pop(key)
+            await redis_publish(SettingsModel.CHANNEL, key)
 
-        row.value = str(value)
-        await redis.setex(r_key, CACHE_TTL, row.value)
+        await db.after_commit(publish)
         return row
 
 
+# other processes drop their local copy
+redis_subscribe(SettingsModel.CHANNEL, SettingsModel.CACHE.pop)
+
+
 class Settings(NoAliasEnum):
     @property
     def type(self) -> Type[T]:
@@ -79,8 +189,30 @@ class Settings(NoAliasEnum):
         return await SettingsModel.get(self.type, self.fullname, self.default)
 
     async def set(self, value: T) -> T:
-        await SettingsModel.get(self.type, self.fullname, value)
+        await SettingsModel.set(self.type, self.fullname, value)
         return value
 
     async def reset(self) -> T:
         return await self.set(self.default)
+
+    @classmethod
+    async def get_many(cls, *members: Settings) -> List[T]:
+        values = await SettingsModel.get_many(
+            {member.fullname: (member.type, member.default) for member in members}
+        )
+        return [values[member.fullname] for member in members]
+
+    @classmethod
+    async def prefetch(cls) -> NoReturn:
+        """
+        Loads every member into the process-local cache.
+        """
+        await cls.get_many(*cls)
+
+
+async def prefetch_settings() -> NoReturn:
+    """
+    Prefetches the ``Settings`` of every scale.
+    """
+    for settings in get_subclasses_in_scales(Settings):
+        await settings.prefetch()
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+
+__all__ = (
+    "Startup",
+    "startup",
+)
+
+
+from asyncio import gather
+from typing import TYPE_CHECKING
+
+from AlbertUnruhUtils.utils.logger import get_logger
+
+from .database import db, db_wrapper
+
+
+if TYPE_CHECKING:
+    from typing import Awaitable, Callable, Dict, List, NoReturn, Optional
+
+
+logger = get_logger(__name__.split(".")[-1], level=None, add_handler=False)
+
+
+class Startup:
+    """
+    Runs the startup hooks once the database is ready.
+
+    Notes
+    -----
+    Hooks run in the order of their phase (lowest first),
+    hooks of the same phase run concurrently and each within its own ``db_context``.
+    """
+
+    _hooks: Dict[int, List[Callable[[], Awaitable]]]
+
+    def __init__(self):
+        self._hooks = {}
+
+    def register(
+        self, hook: Optional[Callable[[], Awaitable]] = None, *, phase: int = 0
+    ):
+        """
+        Registers a hook (can be used as decorator as well).
+
+        Parameters
+        ----------
+        hook: Callable[[], Awaitable], optional
+            The hook to run.
+        phase: int
+            The phase to run the hook in.
+        """
+        if hook is None:
+            return lambda h: self.register(h, phase=phase)
+
+        self._hooks.setdefault(phase, []).append(hook)
+        return hook
+
+    async def run(self) -> NoReturn:
+        """
+        Waits for ``db.ready`` and runs every registered hook.
+        """
+        await db.ready()
+
+        hooks, self._hooks = self._hooks, {}
+        for phase in sorted(hooks):
+            logger.debug(f"Running {len(hooks[phase])} startup hooks of phase {phase}")
+            await gather(*(db_wrapper(hook)() for hook in hooks[phase]))
+
+
+startup: Startup = Startup()
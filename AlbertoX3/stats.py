@@ -5,6 +5,9 @@ __all__ = (
     "StatsModel",
     "StatsEnum",
     "DailyStatsModel",
+    "DetailedStatsModel",
+    "StatsAggregator",
+    "stats_aggregator",
     "try_increment",
 )
 
@@ -12,26 +15,39 @@ __all__ = (
 import importlib
 
 from aenum import EnumType
+from asyncio import CancelledError, Lock, sleep
 from datetime import datetime
+from time import time
 from sqlalchemy import Column, String, BigInteger
 from typing import TYPE_CHECKING
 
 from AlbertUnruhUtils.utils.logger import get_logger
 
-from .aio import run_as_task
+from .aio import event_loop, run_as_task
 from .enum import NoAliasEnum
-from .database import Base, db, db_context
+from .database import Base, db, db_context, filter_by
+from .environment import STATS_FLUSH_INTERVAL
+from .instrumentation import LATENCY_BUCKETS, latency_bucket, latency_percentile
 
 
 if TYPE_CHECKING:
+    from asyncio import Task
     from naff import Context as nContext
     from types import ModuleType
-    from typing import Optional
+    from typing import Dict, List, Optional, NoReturn, Tuple
 
 
 logger = get_logger(__name__.split(".")[-1], level=None, add_handler=False)
 
 
+def _format_date(date: Optional[datetime, str] = None) -> str:
+    if date is None:
+        return stats_aggregator.today()
+    if isinstance(date, datetime):
+        date = date.strftime("%Y-%m-%d")
+    return date
+
+
 class StatsModel(Base):
     __tablename__ = "stats"
 
@@ -42,24 +58,45 @@ class StatsModel(Base):
 
     @staticmethod
     async def get(name: str) -> StatsModel:
+        """
+        Returns the stored stats or unsaved ones with a value of 0.
+
+        Notes
+        -----
+        Rows are only created by ``incr`` (an upsert), adding them here could
+        insert a row a second time after a concurrent ``incr``.
+        """
         if (stats := await db.get(StatsModel, name=name)) is None:
-            return await db.add(StatsModel(name=name, value=0))
+            return StatsModel(name=name, value=0)
         return stats
 
     @staticmethod
-    async def incr(name: str, value: int = 1) -> StatsModel:
-        stats = await StatsModel.get(name)
-        stats.value += value
-        return stats
+    async def incr(name: str, value: int = 1) -> NoReturn:
+        await db.upsert_increment(
+            StatsModel, {"name": name}, {"value": value}, returning=False
+        )
 
 
 class StatsEnum(NoAliasEnum):
-    async def incr(self) -> int:
-        return (await StatsModel.incr(self.fullname)).value
+    async def get(self) -> int:
+        """
+        Returns the stored value including the not yet flushed increments.
+        """
+        stored = (await StatsModel.get(self.fullname)).value
+        return stored + stats_aggregator.pending_stats(self.fullname)
+
+    async def incr(self, value: int = 1) -> NoReturn:
+        stats_aggregator.incr_stats(self.fullname, value)
 
     async def reset(self) -> int:
-        stats = await StatsModel.get(self.fullname)
-        stats.value = 0
+        stats_aggregator.discard_stats(self.fullname)
+        await db.upsert_increment(
+            StatsModel,
+            {"name": self.fullname},
+            {"value": 0},
+            relative=False,
+            returning=False,
+        )
         return 0
 
 
@@ -75,29 +112,299 @@ class DailyStatsModel(Base):
 
     @staticmethod
     async def get(date: Optional[datetime, str] = None) -> DailyStatsModel:
-        if date is None:
-            date = datetime.utcnow()
-        if isinstance(date, datetime):
-            date = date.strftime("%Y-%m-%d")
+        """
+        Returns the stored stats or unsaved ones without any commands or events.
+        """
+        date = _format_date(date)
         if (stats := await db.get(DailyStatsModel, date=date)) is None:
-            return await db.add(DailyStatsModel(date=date, commands=0, events=0))
+            return DailyStatsModel(date=date, commands=0, events=0)
         return stats
 
+    @staticmethod
+    async def incr(
+        date: Optional[datetime, str] = None, commands: int = 0, events: int = 0
+    ) -> NoReturn:
+        await db.upsert_increment(
+            DailyStatsModel,
+            {"date": _format_date(date)},
+            {"commands": commands, "events": events},
+            returning=False,
+        )
+
     @staticmethod
     async def incr_commands(
         date: Optional[datetime, str] = None, value: int = 1
-    ) -> DailyStatsModel:
-        stats = await DailyStatsModel.get(date)
-        stats.commands += value
-        return stats
+    ) -> NoReturn:
+        stats_aggregator.incr_daily(_format_date(date), "commands", value)
 
     @staticmethod
     async def incr_events(
         date: Optional[datetime, str] = None, value: int = 1
-    ) -> DailyStatsModel:
-        stats = await DailyStatsModel.get(date)
-        stats.events += value
-        return stats
+    ) -> NoReturn:
+        stats_aggregator.incr_daily(_format_date(date), "events", value)
+
+    @staticmethod
+    async def get_commands(date: Optional[datetime, str] = None) -> int:
+        date = _format_date(date)
+        stored = (await DailyStatsModel.get(date)).commands
+        return stored + stats_aggregator.pending_daily(date, "commands")
+
+    @staticmethod
+    async def get_events(date: Optional[datetime, str] = None) -> int:
+        date = _format_date(date)
+        stored = (await DailyStatsModel.get(date)).events
+        return stored + stats_aggregator.pending_daily(date, "events")
+
+
+class DetailedStatsModel(Base):
+    __tablename__ = "detailed_stats"
+
+    # format: YYYY-MM-DD (has a length of 10)
+    date: Column | str = Column(String(10), primary_key=True, nullable=False)
+    # either "command" or "event"
+    kind: Column | str = Column(String(16), primary_key=True, nullable=False)
+    name: Column | str = Column(String(128), primary_key=True, nullable=False)
+    count: Column | int = Column(BigInteger, nullable=False)
+    # in microseconds
+    latency_sum: Column | int = Column(BigInteger, nullable=False)
+    # latency_0 ... latency_n: one column per bucket (added below the class)
+
+    VALUES: Tuple[str, ...] = ("count", "latency_sum") + tuple(
+        f"latency_{i}" for i in range(len(LATENCY_BUCKETS) + 1)
+    )
+    """The columns written by ``incr`` (in this order)"""
+
+    @staticmethod
+    async def incr(date: str, kind: str, name: str, values: List[int]) -> NoReturn:
+        await db.upsert_increment(
+            DetailedStatsModel,
+            {"date": date, "kind": kind, "name": name},
+            dict(zip(DetailedStatsModel.VALUES, values)),
+            returning=False,
+        )
+
+    @staticmethod
+    async def get(
+        date: Optional[datetime, str] = None, kind: Optional[str] = None
+    ) -> List[DetailedStatsModel]:
+        if kind is None:
+            return await db.all(filter_by(DetailedStatsModel, date=_format_date(date)))
+        return await db.all(
+            filter_by(DetailedStatsModel, date=_format_date(date), kind=kind)
+        )
+
+    @property
+    def buckets(self) -> List[int]:
+        return [getattr(self, f"latency_{i}") for i in range(len(LATENCY_BUCKETS) + 1)]
+
+    @property
+    def latency_avg(self) -> float:
+        """
+        The average latency in milliseconds.
+        """
+        return self.latency_sum / self.count / 1000 if self.count else 0
+
+    def latency_percentile(self, percentile: float) -> Optional[int]:
+        """
+        See ``instrumentation.latency_percentile``.
+        """
+        return latency_percentile(self.buckets, percentile)
+
+
+# generated to always match ``LATENCY_BUCKETS`` (including the unbounded bucket)
+for _i in range(len(LATENCY_BUCKETS) + 1):
+    setattr(DetailedStatsModel, f"latency_{_i}", Column(BigInteger, nullable=False))
+del _i
+
+
+class StatsAggregator:
+    """
+    Write-behind aggregator for ``StatsModel`` and ``DailyStatsModel``.
+
+    Increments are collected in memory and written periodically
+    (and on shutdown) with one statement per key.
+    """
+
+    interval: float
+    _stats: Dict[str, int]
+    _daily: Dict[Tuple[str, str], int]
+    _details: Dict[Tuple[str, str, str], List[int]]
+    """(date, kind, name) -> values for ``DetailedStatsModel.VALUES``"""
+    _flushing_stats: Dict[str, int]
+    _flushing_daily: Dict[Tuple[str, str], int]
+    _flushing_details: Dict[Tuple[str, str, str], List[int]]
+    _lock: Lock
+    _task: Optional[Task]
+    _day: str
+    _day_end: float
+
+    def __init__(self, interval: float):
+        """
+        Parameters
+        ----------
+        interval: float
+            The amount of seconds to wait between two flushes.
+        """
+        self.interval = interval
+        self._stats = {}
+        self._daily = {}
+        self._details = {}
+        self._flushing_stats = {}
+        self._flushing_daily = {}
+        self._flushing_details = {}
+        self._lock = Lock()
+        self._task = None
+        self._day = ""
+        self._day_end = 0
+
+    def today(self) -> str:
+        """
+        Returns the current UTC date (format: YYYY-MM-DD).
+        """
+        if (now := time()) >= self._day_end:
+            self._day = datetime.utcfromtimestamp(now).strftime("%Y-%m-%d")
+            self._day_end = (now // 86400 + 1) * 86400
+        return self._day
+
+    def incr_stats(self, name: str, value: int = 1) -> NoReturn:
+        self._stats[name] = self._stats.get(name, 0) + value
+
+    def incr_daily(self, date: str, column: str, value: int = 1) -> NoReturn:
+        key = date, column
+        self._daily[key] = self._daily.get(key, 0) + value
+
+    def record(self, kind: str, name: str, latency: float) -> NoReturn:
+        """
+        Counts a processed command or event for today.
+
+        Parameters
+        ----------
+        kind: str
+            Either ``"command"`` or ``"event"``.
+        name: str
+            The name of the command or event.
+        latency: float
+            The processing time in seconds.
+
+        Notes
+        -----
+        Every name has its own counter, the sum of the events
+        gets written to ``DailyStatsModel.events`` as well.
+        """
+        if (values := self._details.get(key := (self.today(), kind, name))) is None:
+            values = self._details[key] = [0] * len(DetailedStatsModel.VALUES)
+
+        values[0] += 1
+        values[1] += int(latency * 1_000_000)
+        values[2 + latency_bucket(latency)] += 1
+
+    def _restore_details(
+        self, details: Dict[Tuple[str, str, str], List[int]]
+    ) -> NoReturn:
+        for key, values in details.items():
+            if (pending := self._details.get(key)) is None:
+                self._details[key] = values
+            else:
+                self._details[key] = [a + b for a, b in zip(pending, values)]
+
+    def pending_stats(self, name: str) -> int:
+        return self._stats.get(name, 0) + self._flushing_stats.get(name, 0)
+
+    def pending_daily(self, date: str, column: str) -> int:
+        key = date, column
+        pending = self._daily.get(key, 0) + self._flushing_daily.get(key, 0)
+        if column == "events":
+            for details in (self._details, self._flushing_details):
+                for (d, kind, _), values in details.items():
+                    if d == date and kind == "event":
+                        pending += values[0]
+        return pending
+
+    def discard_stats(self, name: str) -> NoReturn:
+        self._stats.pop(name, None)
+
+    async def flush(self) -> NoReturn:
+        """
+        Writes every pending increment to the database.
+
+        Notes
+        -----
+        If writing fails, the increments are kept for the next flush.
+        """
+        async with self._lock:
+            self._flushing_stats, self._stats = self._stats, {}
+            self._flushing_daily, self._daily = self._daily, {}
+            self._flushing_details, self._details = self._details, {}
+
+            if not (
+                self._flushing_stats or self._flushing_daily or self._flushing_details
+            ):
+                return
+
+            daily: Dict[str, Dict[str, int]] = {}
+            for (date, column), value in self._flushing_daily.items():
+                daily.setdefault(date, {})[column] = value
+            for (date, kind, _), values in self._flushing_details.items():
+                if kind == "event":
+                    daily_values = daily.setdefault(date, {})
+                    daily_values["events"] = daily_values.get("events", 0) + values[0]
+
+            try:
+                async with db_context(new=True):
+                    try:
+                        for name, value in self._flushing_stats.items():
+                            await StatsModel.incr(name, value)
+                        for date, values in daily.items():
+                            await DailyStatsModel.incr(date, **values)
+                        for key, values in self._flushing_details.items():
+                            await DetailedStatsModel.incr(*key, values)
+                    except BaseException:
+                        await db.session.rollback()
+                        raise
+            except (Exception, CancelledError) as e:
+                for name, value in self._flushing_stats.items():
+                    self.incr_stats(name, value)
+                for (date, column), value in self._flushing_daily.items():
+                    self.incr_daily(date, column, value)
+                self._restore_details(self._flushing_details)
+                if isinstance(e, CancelledError):
+                    raise
+                logger.warning(f"Unable to flush stats, retrying later: {e!r}")
+            else:
+                logger.debug(
+                    f"Flushed {len(self._flushing_stats)} stats, "
+                    f"{len(daily)} daily stats "
+                    f"and {len(self._flushing_details)} detailed stats"
+                )
+            finally:
+                self._flushing_stats = {}
+                self._flushing_daily = {}
+                self._flushing_details = {}
+
+    async def _run(self) -> NoReturn:
+        while True:
+            await sleep(self.interval)
+            await self.flush()
+
+    def start(self) -> NoReturn:
+        """
+        Starts flushing periodically.
+        """
+        if self._task is None:
+            self._task = event_loop.create_task(self._run())
+
+    async def stop(self) -> NoReturn:
+        """
+        Stops flushing periodically and writes the remaining increments.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+
+
+# global stats aggregator
+stats_aggregator = StatsAggregator(STATS_FLUSH_INTERVAL)
 
 
 @run_as_task
@@ -108,9 +415,8 @@ async def try_increment(module: ModuleType, context: nContext) -> bool:
     stats: Optional[StatsEnum]
 
     # first daily stats, then individual stats
-    async with db_context():
-        value = (await DailyStatsModel.incr_commands()).commands
-    logger.info(f"Incremented daily stats ({value})")
+    await DailyStatsModel.incr_commands()
+    logger.info("Incremented daily stats")
 
     # now the individual stats (if there are such)
     if (stats := getattr(module, "Stats", None)) is None:
@@ -147,10 +453,7 @@ async def try_increment(module: ModuleType, context: nContext) -> bool:
         )
         return False
 
-    async with db_context():
-        value = await enum.incr()
+    await enum.incr()
 
-    logger.info(
-        f"Incremented stats for {context.__name__!r} in {module.__package__!r} ({value})"
-    )
+    logger.info(f"Incremented stats for {context.__name__!r} in {module.__package__!r}")
     return True
@@ -10,17 +10,20 @@ __all__ = (
 
 
 from AlbertUnruhUtils.utils.logger import get_logger
+from asyncio import gather, to_thread
+from copy import deepcopy
 from pathlib import Path
+from threading import Lock
 from typing import TYPE_CHECKING
-from yaml import safe_load
 
+from .aio import SingleFlight
 from .config import Config
-from .types import PrimitiveScale, FormatStr
-from .utils import get_language
+from .types import PrimitiveScale, FormatStr, compile_template
+from .utils import current_language, load_yaml
 
 
 if TYPE_CHECKING:
-    from typing import Dict, List, Optional, NoReturn, Any
+    from typing import Dict, FrozenSet, List, Optional, NoReturn, Any, Tuple
 
 
 logger = get_logger(__name__.split(".")[-1], level=None, add_handler=False)
@@ -55,41 +58,69 @@ def merge(
 
 
 class TranslationDict(dict):
-    _fallback: Dict
+    """
+    A compiled translation-node, the fallback-language is already merged in.
+    """
 
     def __call__(self, *args, **kwargs):
         cnt = kwargs.get("cnt", kwargs.get("count", None))
 
-        translation: str
+        translation: FormatStr
         if cnt == 1:
-            translation = self.one
+            translation = self["one"]
         elif cnt == 0 and "zero" in self:  # optional
-            translation = self.zero
+            translation = self["zero"]
         else:
-            translation = self.many
+            translation = self["many"]
 
-        return translation.format(*args, **kwargs)
+        return compile_template(translation)(*args, **kwargs)
 
     def __getattr__(self, item: str):
-        value = self.get(item, self._fallback[item])
+        return self[item]
+
 
-        if isinstance(value, str):
-            value = FormatStr(value)
-        elif isinstance(value, dict):
-            value = TranslationDict(value)
-            value._fallback = self._fallback[item]
+def compile_translations(value: Any, path: str, entries: Dict[str, Any]) -> Any:
+    """
+    Compiles raw translations into ``FormatStr`` and ``TranslationDict``.
 
-        return value
+    Parameters
+    ----------
+    value: Any
+        The raw translation(s).
+    path: str
+        The dotted path of ``value``.
+    entries: Dict[str, Any]
+        Every compiled value gets added with its dotted path.
+
+    Returns
+    -------
+    Any
+        The compiled value.
+    """
+    if isinstance(value, str):
+        value = FormatStr(value)
+    elif isinstance(value, dict):
+        value = TranslationDict(
+            {
+                key: compile_translations(sub, f"{path}.{key}", entries)
+                for key, sub in value.items()
+            }
+        )
 
-    def __contains__(self, item) -> bool:
-        return super().__contains__(item) or self._fallback.__contains__(item)
+    entries[path] = value
+    return value
 
 
 class TranslationNamespace:
+    _name: str
+    _parent: Translations
     _sources: List[Path]
     _translations: Dict[str, Dict[str, Any]]
+    """The raw (merged) translations per language"""
 
-    def __init__(self):
+    def __init__(self, name: str, parent: Translations):
+        self._name = name
+        self._parent = parent
         self._sources = []
         self._translations = {}
 
@@ -105,49 +136,171 @@ class TranslationNamespace:
 
         if lan not in self._translations:
             logger.debug(f"Creating translations for {lan!r}")
-            self._translations[lan] = {}
+            # only assigned once complete, other threads may read it meanwhile
+            translations = {}
             for source in self._sources:
                 if not (path := source / f"{lan}.yml".lower()).exists():
                     continue
-                with path.open() as file:
-                    merge(self._translations[lan], safe_load(file) or {})
+                merge(translations, load_yaml(path) or {})
+            self._translations[lan] = translations
 
         return self._translations[lan]
 
     def tn_get_translation(self, key: str):
-        translations = self.tn_get_language(get_language() or Config.LANGUAGE_DEFAULT)
-        if key not in translations:
-            translations = self.tn_get_language(Config.LANGUAGE_FALLBACK)
-
-        return translations[key]
-
-    def __getattr__(self, item: str):
-        value = self.tn_get_translation(item)
-
-        if isinstance(value, str):
-            value = FormatStr(value)
-        elif isinstance(value, dict):
-            value = TranslationDict(value)
-            value._fallback = self.tn_get_language(Config.LANGUAGE_FALLBACK)[item]
+        return self._parent.get_translation(
+            current_language.get() or Config.LANGUAGE_DEFAULT, self._name, key
+        )
 
-        return value
+    __getattr__ = tn_get_translation
 
 
 class Translations:
     FALLBACK: str = "EN"
     _namespace: Dict[str, TranslationNamespace]
+    _catalogue: Dict[Tuple[str, str, str], Any]
+    """The compiled translations by language, namespace and dotted path"""
+    _languages: FrozenSet[str]
+    """The languages within ``_catalogue``"""
+    _lock: Lock
+    _single_flight: SingleFlight
 
     def __init__(self):
         self._namespace = {}
+        self._catalogue = {}
+        self._languages = frozenset()
+        self._lock = Lock()
+        self._single_flight = SingleFlight()
 
     def register_translation_namespace(self, name: str, file: Path) -> NoReturn:
         if name not in self._namespace:
             logger.debug(f"Creating TranslationNamespace for {name!r}")
-            self._namespace[name] = TranslationNamespace()
+            self._namespace[name] = TranslationNamespace(name, self)
         else:
             logger.debug(f"Extending TranslationNamespace for {name!r}")
 
         self._namespace[name].tn_add_source(file)
+        with self._lock:
+            self._catalogue = {}
+            self._languages = frozenset()
+
+    def compile(self, lan: str) -> NoReturn:
+        """
+        Compiles the translations of a language into the catalogue.
+
+        Parameters
+        ----------
+        lan: str
+            The language to compile.
+
+        Notes
+        -----
+        Missing translations are taken from ``Config.LANGUAGE_FALLBACK``.
+        The catalogue gets replaced instead of modified,
+        therefore it's never seen partially compiled.
+        This reads files, use ``load`` within the event-loop.
+        """
+        logger.debug(f"Compiling translations for {lan!r}")
+        fallback = Config.LANGUAGE_FALLBACK
+
+        compiled = {}
+        for name, namespace in self._namespace.items():
+            tree = namespace.tn_get_language(lan)
+            if lan != fallback:
+                tree = merge(deepcopy(namespace.tn_get_language(fallback)), tree)
+
+            entries = {}
+            for key, value in tree.items():
+                compile_translations(value, key, entries)
+            for path, value in entries.items():
+                compiled[lan, name, path] = value
+
+        # languages may be compiled concurrently (see ``warmup``)
+        with self._lock:
+            self._catalogue = {**self._catalogue, **compiled}
+            self._languages |= {lan}
+
+    async def load(self, lan: str) -> NoReturn:
+        """
+        Compiles a language within a thread (if it isn't compiled yet).
+
+        Parameters
+        ----------
+        lan: str
+            The language to compile.
+
+        Notes
+        -----
+        Concurrent calls for the same language compile it only once.
+        """
+        if lan not in self._languages:
+            await self._single_flight.do(lan, to_thread, self.compile, lan)
+
+    async def warmup(self, languages: Optional[List[str]] = None) -> NoReturn:
+        """
+        Loads the sources of every namespace and compiles every language,
+        both concurrently within threads.
+
+        Parameters
+        ----------
+        languages: List[str], optional
+            The languages to compile (defaults to ``Config.LANGUAGE_AVAILABLE``).
+        """
+        if languages is None:
+            languages = Config.LANGUAGE_AVAILABLE
+
+        await gather(
+            *(
+                to_thread(namespace.tn_get_language, lan)
+                for namespace in self._namespace.values()
+                for lan in {*languages, Config.LANGUAGE_FALLBACK}
+            )
+        )
+        await gather(*(self.load(lan) for lan in languages))
+        logger.info(
+            f"Compiled {len(self._namespace)} translation namespaces "
+            f"for {', '.join(languages)}"
+        )
+
+    def get_translation(self, lan: str, namespace: str, path: str) -> Any:
+        """
+        Returns a compiled translation.
+
+        Parameters
+        ----------
+        lan: str
+            The language.
+        namespace: str
+            The namespace.
+        path: str
+            The dotted path of the translation (e.g. ``item.quantity``).
+
+        Returns
+        -------
+        Any
+            A ``FormatStr``, a ``TranslationDict`` or the raw value.
+
+        Raises
+        ------
+        KeyError
+            If there's no such translation.
+
+        Notes
+        -----
+        A language which isn't compiled yet gets compiled right here,
+        which blocks the event-loop (use ``load`` or ``warmup`` beforehand).
+        """
+        try:
+            return self._catalogue[lan, namespace, path]
+        except KeyError:
+            if lan in self._languages:
+                raise
+
+        logger.warning(
+            f"Compiling translations for {lan!r} lazily, this blocks the event-loop "
+            f"(use Translations.load or Translations.warmup beforehand)"
+        )
+        self.compile(lan)
+        return self._catalogue[lan, namespace, path]
 
     def __getattr__(self, item: str) -> TranslationNamespace:
         return self._namespace[item]
@@ -4,17 +4,146 @@ from __future__ import annotations
 __all__ = (
     "FormatStr",
     "PrimitiveScale",
+    "Segment",
+    "parse_template",
+    "compile_template",
 )
 
 
+from _string import formatter_field_name_split
+from functools import lru_cache
 from pathlib import Path
-from typing import NamedTuple
+from string import Formatter
+from typing import TYPE_CHECKING, NamedTuple, Optional
+
+
+if TYPE_CHECKING:
+    from typing import Any, Callable, Dict, Tuple
 
 
 class FormatStr(str):
+    # ``str.format`` parses in C, forwarding to ``compile_template``
+    # through a python-level ``__call__`` costs more than it saves
     __call__ = str.format
 
 
 PrimitiveScale = NamedTuple(
     "PrimitiveScale", (("name", str), ("package", str), ("path", Path))
 )
+
+
+Segment = NamedTuple(
+    "Segment",
+    (
+        ("literal", str),
+        ("field", Optional[str]),
+        ("spec", Optional[str]),
+        ("conversion", Optional[str]),
+    ),
+)
+
+
+_formatter = Formatter()
+
+
+def parse_template(template: str) -> Tuple[Segment, ...]:
+    """
+    Parses a template into its literal and field segments.
+
+    Parameters
+    ----------
+    template: str
+        The template (using the syntax of ``str.format``).
+
+    Returns
+    -------
+    Tuple[Segment, ...]
+
+    Raises
+    ------
+    ValueError
+        If the template is malformed.
+    """
+    return tuple(Segment(*parsed) for parsed in _formatter.parse(template))
+
+
+@lru_cache(maxsize=4096)
+def compile_template(template: str) -> Callable[..., str]:
+    """
+    Compiles a template into a function rendering it.
+
+    Parameters
+    ----------
+    template: str
+        The template (using the syntax of ``str.format``).
+
+    Returns
+    -------
+    Callable[..., str]
+        Takes the same arguments as ``template.format``.
+
+    Notes
+    -----
+    The segments are joined by a generated f-string,
+    the template itself never becomes part of the generated source.
+    Templates which can't be compiled (nested fields within a format-spec,
+    mixed automatic and manual numbering, invalid conversions or malformed ones)
+    fall back to ``template.format``.
+    """
+    try:
+        segments = parse_template(template)
+    except ValueError:
+        return template.format
+
+    if all(segment.field is None for segment in segments):
+        literal = "".join(segment.literal for segment in segments)
+        return lambda *_, **__: literal
+
+    namespace: Dict[str, Any] = {}
+
+    def bind(value: Any) -> str:
+        name = f"_{len(namespace)}"
+        namespace[name] = value
+        return name
+
+    parts = []
+    automatic = 0
+    manual = False
+    for literal, field, spec, conversion in segments:
+        if literal:
+            parts.append(f"{{{bind(literal)}}}")
+        if field is None:
+            continue
+        if "{" in spec:
+            return template.format
+
+        first, rest = formatter_field_name_split(field)
+        if first == "":
+            first = automatic
+            automatic += 1
+        elif isinstance(first, int):
+            manual = True
+        if automatic and manual:
+            return template.format
+
+        if isinstance(first, int):
+            expression = f"args[{first}]"
+        else:
+            expression = f"kwargs[{bind(first)}]"
+        for is_attribute, key in rest:
+            if is_attribute:
+                expression = f"getattr({expression}, {bind(key)})"
+            else:
+                expression = f"{expression}[{bind(key)}]"
+
+        if conversion:
+            expression += f"!{conversion}"
+        if spec:
+            expression += f":{{{bind(spec)}}}"
+        parts.append(f"{{{expression}}}")
+
+    source = f'lambda *args, **kwargs: f"{"".join(parts)}"'
+    try:
+        return eval(source, namespace)
+    except (SyntaxError, ValueError):  # e.g. invalid conversions
+        return template.format
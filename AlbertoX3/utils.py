@@ -7,19 +7,36 @@ __all__ = (
     "get_user",
     "get_bool",
     "get_subclasses_in_scales",
+    "current_language",
     "get_language",
+    "load_yaml",
 )
 
 
+import marshal
+import os
 import re
 import sys
 
+from contextlib import suppress
+from contextvars import ContextVar
+from hashlib import sha1
+from pathlib import Path
+from tempfile import NamedTemporaryFile
 from typing import TYPE_CHECKING, TypeVar, Type
+from yaml import load
+
 from naff import Context, User, Member, Snowflake_Type
 
 from .types import PrimitiveScale
 
 
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:  # PyYAML was built without libyaml
+    from yaml import SafeLoader
+
+
 if TYPE_CHECKING:
     from typing import List, Optional, Any
 
@@ -27,6 +44,12 @@ if TYPE_CHECKING:
 T = TypeVar("T")
 
 
+current_language: ContextVar[Optional[str]] = ContextVar(
+    "current_language", default=None
+)
+"""The language of the current command (resolved once per command)"""
+
+
 def get_values(obj: object) -> str:
     keys: List[str] = [k for k in dir(obj) if not k.startswith("_")]
     length: int = len(max(keys, key=len))
@@ -230,8 +253,94 @@ def get_language(
     guild: Snowflake_Type = None,
     user: Snowflake_Type = None,
 ) -> str | None:
+    """
+    Returns the language of a guild, a user or the current command.
+
+    Parameters
+    ----------
+    guild: Snowflake_Type, optional
+        The guild to get the cached language of.
+    user: Snowflake_Type, optional
+        The user to get the cached language of.
+
+    Returns
+    -------
+    str, optional
+        ``None`` if there's no (cached) preference.
+
+    Notes
+    -----
+    This never hits the database, use ``resolve_language`` to load a language.
+    """
     assert not (
         guild is not None and user is not None
     ), "Can't have both 'guild' and 'user' set!"
-    # ToDo: connect to database
-    return None
+
+    if guild is None and user is None:
+        return current_language.get()
+
+    from .language import LanguageModel
+
+    key = (int(user), True) if user is not None else (int(guild), False)
+    return LanguageModel.CACHE.get(key, None)
+
+
+def load_yaml(path: Path, *, cache: bool = True) -> Any:
+    """
+    Loads a YAML-file (using libyaml if available).
+
+    Parameters
+    ----------
+    path: Path
+        The file to load.
+    cache: bool
+        Whether the parsed file should be cached within ``Config.TMP_FOLDER``
+        (only possible once the config is loaded).
+
+    Returns
+    -------
+    Any
+
+    Notes
+    -----
+    The cache is keyed by the path, the modification-time and the size of the file
+    and stored using ``marshal``, values ``marshal`` can't store aren't cached.
+    """
+    from .config import Config
+
+    stat = path.stat()
+    key = (str(path.resolve()), stat.st_mtime_ns, stat.st_size)
+
+    file = None
+    if cache and (folder := getattr(Config, "TMP_FOLDER", None)) is not None:
+        file = folder / "yaml" / f"{sha1(key[0].encode()).hexdigest()}.marshal"
+        try:
+            cached, data = marshal.loads(file.read_bytes())
+            if cached == key:
+                return data
+        except (OSError, EOFError, ValueError, TypeError):
+            pass
+
+    with path.open(encoding="utf-8") as f:
+        data = load(f, Loader=SafeLoader)
+
+    if file is not None:
+        try:
+            dumped = marshal.dumps((key, data))
+        except ValueError:  # e.g. dates
+            return data
+        # other processes and threads may write the same file,
+        # so it gets written to a unique file first and replaced atomically
+        tmp = None
+        try:
+            file.parent.mkdir(exist_ok=True)
+            with NamedTemporaryFile(dir=file.parent, delete=False) as out:
+                tmp = out.name
+                out.write(dumped)
+            os.replace(tmp, file)
+        except OSError:  # the cache is optional
+            if tmp is not None:
+                with suppress(OSError):
+                    os.remove(tmp)
+
+    return data
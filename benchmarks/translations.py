@@ -0,0 +1,96 @@
+"""
+Compares ``str.format`` with ``compile_template`` on the real translation-files.
+
+Run it from the project's root (with the same environment as the bot)::
+
+    python -m benchmarks.translations
+"""
+from __future__ import annotations
+
+
+from pathlib import Path
+from timeit import timeit
+from typing import TYPE_CHECKING
+from yaml import safe_load
+
+from AlbertoX3.types import compile_template, parse_template
+
+
+if TYPE_CHECKING:
+    from typing import Any, Dict, Iterator, List, NoReturn, Tuple
+
+
+NUMBER = 100_000
+
+
+class Dummy:
+    """
+    Stands in for fields with attributes or items.
+    """
+
+    def __getattr__(self, item: str) -> Dummy:
+        return self
+
+    def __getitem__(self, item: Any) -> Dummy:
+        return self
+
+    def __format__(self, format_spec: str) -> str:
+        return "dummy"
+
+    def __repr__(self) -> str:
+        return "Dummy()"
+
+
+def get_templates(root: Path) -> Iterator[str]:
+    def walk(value: Any) -> Iterator[str]:
+        if isinstance(value, str):
+            yield value
+        elif isinstance(value, dict):
+            for sub in value.values():
+                yield from walk(sub)
+
+    for path in sorted(root.glob("**/translations/*.yml")):
+        with path.open() as file:
+            yield from walk(safe_load(file) or {})
+
+
+def get_arguments(template: str) -> Tuple[List[Dummy], Dict[str, Dummy]]:
+    args, kwargs = [], {}
+    for segment in parse_template(template):
+        if segment.field is None:
+            continue
+        name = segment.field.split(".")[0].split("[")[0]
+        # plain fields get a string to not benchmark ``Dummy.__format__``
+        value = "dummy" if name == segment.field and not segment.spec else Dummy()
+        if name == "" or name.isdigit():
+            args.append(value)
+        else:
+            kwargs[name] = value
+    return args, kwargs
+
+
+def main() -> NoReturn:
+    templates = list(dict.fromkeys(get_templates(Path(__file__).parents[1])))
+    print(f"{len(templates)} templates, {NUMBER} calls each\n")
+
+    total_format = total_compiled = total_cached = 0.0
+    for template in templates:
+        args, kwargs = get_arguments(template)
+        render = compile_template(template)
+        assert render(*args, **kwargs) == template.format(*args, **kwargs)
+
+        total_format += timeit(lambda: template.format(*args, **kwargs), number=NUMBER)
+        total_compiled += timeit(lambda: render(*args, **kwargs), number=NUMBER)
+        total_cached += timeit(
+            lambda: compile_template(template)(*args, **kwargs), number=NUMBER
+        )
+
+    per_call = 1e9 / NUMBER / len(templates)
+    print(f"str.format:       {total_format * per_call:8.1f} ns/call")
+    print(f"compiled:         {total_compiled * per_call:8.1f} ns/call")
+    print(f"cache + compiled: {total_cached * per_call:8.1f} ns/call")
+    print(f"speedup:          {total_format / total_compiled:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()